@@ -2,12 +2,17 @@ import pygame
 from settings import *
 
 class Camera:
+    """Камера, следующая за целью (мир рисуется 1:1 на поверхность области просмотра)"""
+    
     def __init__(self):
         # Прямоугольник камеры, определяющий видимую область
         self.rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
         self.width = SCREEN_WIDTH
         self.height = SCREEN_HEIGHT
         self.target = None
+        # Размеры карты с прошлого обновления (для пересчета при смене масштаба)
+        self.map_width = None
+        self.map_height = None
         
         # Добавляем параметр масштаба (zoom)
         self.zoom = 1.5  # Значение больше 1 - приближение, меньше 1 - отдаление
@@ -16,6 +21,15 @@ class Camera:
         self.view_width = int(self.width / self.zoom)
         self.view_height = int(self.height / self.zoom)
         
+        # Положение на прошлом шаге логики и доля шага для плавной отрисовки между ними
+        self.previous_position = self.rect.topleft
+        self.alpha = 1.0
+        self.offset_x = self.rect.x
+        self.offset_y = self.rect.y
+        
+        # Поверхность области просмотра (в формате экрана, пересоздается при смене масштаба)
+        self.view = None
+    
     def set_target(self, target):
         """Установить цель для слежения камерой"""
         self.target = target
@@ -24,7 +38,14 @@ class Camera:
         """Обновить положение камеры, следуя за целью"""
         if not self.target:
             return
-            
+        
+        self.previous_position = self.rect.topleft
+        self.map_width = map_width
+        self.map_height = map_height
+        self._follow_target(map_width, map_height)
+    
+    def _follow_target(self, map_width, map_height):
+        """Центрирует область просмотра текущего масштаба на цели в пределах карты"""
         # Обновляем фактические размеры видимой области с учетом масштаба
         self.view_width = int(self.width / self.zoom)
         self.view_height = int(self.height / self.zoom)
@@ -36,35 +57,65 @@ class Camera:
         # Ограничение камеры границами карты
         self.rect.x = max(0, min(self.rect.x, map_width - self.view_width))
         self.rect.y = max(0, min(self.rect.y, map_height - self.view_height))
+        self.offset_x = self.rect.x
+        self.offset_y = self.rect.y
+    
+    def interpolate(self, alpha):
+        """Готовит камеру к отрисовке состояния между двумя последними шагами логики"""
+        self.alpha = alpha
+        # Смещение целое - все слои сдвигаются на один и тот же пиксель
+        offset_x, offset_y = self.lerp(self.previous_position, self.rect.topleft)
+        self.offset_x = round(offset_x)
+        self.offset_y = round(offset_y)
+    
+    def lerp(self, previous, current):
+        """Точка между положениями на прошлом и текущем шаге логики"""
+        return (previous[0] + (current[0] - previous[0]) * self.alpha,
+                previous[1] + (current[1] - previous[1]) * self.alpha)
+    
+    def apply_moving(self, entity_rect, previous_position):
+        """Как apply, но для движущегося объекта - с его промежуточным положением"""
+        x, y = self.lerp(previous_position, entity_rect.topleft)
+        return self.apply(pygame.Rect(round(x), round(y), entity_rect.width, entity_rect.height))
     
     def apply(self, entity_rect):
-        """Применить смещение камеры к координатам объекта с учетом масштаба"""
-        # Преобразуем координаты объекта относительно камеры
-        screen_x = (entity_rect.x - self.rect.x) * self.zoom
-        screen_y = (entity_rect.y - self.rect.y) * self.zoom
-        
-        # Преобразуем размеры объекта с учетом масштаба
-        screen_width = entity_rect.width * self.zoom
-        screen_height = entity_rect.height * self.zoom
-        
-        return pygame.Rect(screen_x, screen_y, screen_width, screen_height)
+        """Применить смещение камеры к координатам объекта (на поверхности области просмотра)"""
+        return pygame.Rect(entity_rect.x - self.offset_x, entity_rect.y - self.offset_y,
+                           entity_rect.width, entity_rect.height)
     
     def apply_point(self, x, y):
-        """Применить смещение камеры к точке с учетом масштаба"""
-        screen_x = (x - self.rect.x) * self.zoom
-        screen_y = (y - self.rect.y) * self.zoom
-        return (screen_x, screen_y)
+        """Применить смещение камеры к точке"""
+        return (x - self.offset_x, y - self.offset_y)
     
     def apply_rect(self, rect):
-        """Применить смещение камеры к прямоугольнику с учетом масштаба"""
-        screen_x = (rect.x - self.rect.x) * self.zoom
-        screen_y = (rect.y - self.rect.y) * self.zoom
-        screen_width = rect.width * self.zoom
-        screen_height = rect.height * self.zoom
-        
-        return pygame.Rect(screen_x, screen_y, screen_width, screen_height)
-        
+        """Применить смещение камеры к прямоугольнику"""
+        return self.apply(rect)
+    
+    def screen_to_world(self, x, y):
+        """Точка экрана (например, позиция мыши) в координатах мира"""
+        return (x * self.view_width / self.width + self.rect.x,
+                y * self.view_height / self.height + self.rect.y)
+    
+    def view_surface(self, screen):
+        """Поверхность для отрисовки мира в масштабе 1:1 (в формате экрана)"""
+        size = (self.view_width, self.view_height)
+        if self.view is None or self.view.get_size() != size or self.view.get_bitsize() != screen.get_bitsize():
+            self.view = pygame.Surface(size, 0, screen)
+        return self.view
+    
+    def present(self, screen):
+        """Растягивает нарисованную область просмотра на весь экран одним масштабированием"""
+        pygame.transform.scale(self.view, screen.get_size(), screen)
+    
     def adjust_zoom(self, amount):
         """Изменить масштаб камеры"""
         # Ограничиваем масштаб от 0.5 (отдалено) до 2.5 (сильно приближено)
-        self.zoom = max(0.5, min(2.5, self.zoom + amount))
\ No newline at end of file
+        self.zoom = max(0.5, min(2.5, self.zoom + amount))
+        
+        # Новый масштаб виден сразу, в том числе на паузе, когда update() не вызывается
+        if self.target and self.map_width is not None:
+            self._follow_target(self.map_width, self.map_height)
+            self.previous_position = self.rect.topleft
+        else:
+            self.view_width = int(self.width / self.zoom)
+            self.view_height = int(self.height / self.zoom)
\ No newline at end of file
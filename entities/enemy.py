@@ -3,31 +3,65 @@ import math
 import random
 from settings import *
 from abc import ABC, abstractmethod
+from utils.asset_manager import assets
+
+# Заранее подготовленные спрайты врагов: имя спрайта -> {прозрачность: поверхность}.
+# Общие для всех врагов одного типа
+_sprite_variants = {}
+
+# Прямоугольники врагов без спрайта: (цвет RGBA, размер) -> поверхность
+_rect_variants = {}
+
+
+def _bake_alpha(sprite, alpha):
+    """Копия спрайта с прозрачностью, умноженной на alpha (рисуется обычным blit)"""
+    variant = sprite.copy()
+    if alpha < 255:
+        variant.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+    return variant
+
+
+def bake_sprite_variants(sprite_name, alphas):
+    """Спрайт sprite_name во всех значениях прозрачности alphas (готовится один раз на спрайт)"""
+    variants = _sprite_variants.get(sprite_name)
+    if variants is None:
+        sprite = assets.sprite(sprite_name)
+        variants = {alpha: _bake_alpha(sprite, alpha) for alpha in alphas}
+        variants.setdefault(255, sprite)
+        _sprite_variants[sprite_name] = variants
+    return variants
+
 
 class Enemy(ABC):
     """Базовый абстрактный класс для всех врагов"""
     
-    def __init__(self, x, y, size, speed, color, sprite_path=None, sound_manager=None):
+    def __init__(self, x, y, size, speed, color, sprite_name=None, sound_manager=None, rng=None):
+        self.random = rng or random.Random()  # Генератор случайных чисел врага (задается менеджером)
         self.rect = pygame.Rect(x, y, size, size)
         self.speed = speed
         self.color = color
         self.state = "idle"  # idle, chase, affected_by_light, fading
-        self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        self.direction = self.random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
         self.idle_timer = 0
-        self.idle_duration = random.randint(60, 120)  # 1-2 секунды при 60 FPS
+        self.idle_duration = self.random.randint(60, 120)  # 1-2 секунды при 60 FPS
         self.effect_timer = 0
         self.visible = True
+        self.previous_position = self.rect.topleft  # Положение на прошлом шаге логики
+        self.route = None  # Выбранный проход на пути к игроку через граф комнат
+        self.direct_chase = False  # Идет ли враг к игроку по прямой
+        self.remainder_x = 0.0  # Дробные доли сдвига, накопленные между кадрами
+        self.remainder_y = 0.0
         
-        # Загружаем спрайт, если путь предоставлен, с увеличенным размером
+        # Спрайт из общего менеджера ресурсов (увеличенный относительно размера врага)
         self.sprite = None
         self.sprite_offset_x = 0
         self.sprite_offset_y = 0
         
-        if sprite_path:
-            self.sprite = pygame.image.load(sprite_path).convert_alpha()
-            # Увеличиваем размер спрайта (в 1.8 раза больше базового размера врага)
-            sprite_size = int(size * 1.8)
-            self.sprite = pygame.transform.scale(self.sprite, (sprite_size, sprite_size))
+        if sprite_name:
+            # Все состояния прозрачности типа врага готовятся сразу
+            self.sprite_variants = bake_sprite_variants(sprite_name, self.draw_alphas())
+            self.sprite = self.sprite_variants[255]
+            sprite_size = self.sprite.get_width()
             
             # Сохраняем смещение для центрирования спрайта
             self.sprite_offset_x = (sprite_size - size) // 2
@@ -43,10 +77,13 @@ class Enemy(ABC):
         self._light_hit_played = False
         self._light_hit_timer = 0
         
-    def update(self, player, level, flashlight_on):
+    def update(self, player, level, flashlight_on, in_light=None):
         """Обновление состояния врага"""
-        # Проверка, находится ли враг в свете фонарика
-        in_light = self.is_in_light(player, level)
+        self.previous_position = self.rect.topleft
+        
+        # Проверка, находится ли враг в свете фонарика (если менеджер не посчитал ее заранее)
+        if in_light is None:
+            in_light = self.is_in_light(player, level)
         
         # Обработка эффекта света на врага
         if in_light and flashlight_on and self.visible:
@@ -110,34 +147,75 @@ class Enemy(ABC):
     
     def chase_player(self, player, level):
         """Преследование игрока"""
-        dx = player.rect.centerx - self.rect.centerx
-        dy = player.rect.centery - self.rect.centery
+        target_x, target_y = player.rect.center
+        
+        # Идем напрямую, только если к игроку проходит весь прямоугольник врага. Чтобы не
+        # переключаться туда-обратно на границе, для перехода на прямой путь нужен запас
+        # (кешированная проверка видимости отсекает большинство случаев до проверки по размеру врага)
+        margin = 0 if self.direct_chase else 4
+        self.direct_chase = (
+            level.has_line_of_sight(self.rect.centerx, self.rect.centery, target_x, target_y)
+            and level.has_clear_path(self.rect.centerx, self.rect.centery, target_x, target_y,
+                                     self.rect.width + margin))
+        
+        # Иначе идем по общему полю путей к следующей клетке
+        if not self.direct_chase:
+            next_step = level.flow_field.next_step(self.rect.centerx, self.rect.centery)
+            if next_step is None:
+                # Игрок за пределами поля путей - идем к нему через комнаты и коридоры
+                next_step, self.route = level.region_planner.next_step(self.rect.centerx, self.rect.centery,
+                                                                       target_x, target_y, self.route)
+            if next_step:
+                # По осям независимо, чтобы выравниваться по клетке и не цепляться за углы
+                dx = max(-self.speed, min(self.speed, next_step[0] - self.rect.centerx))
+                dy = max(-self.speed, min(self.speed, next_step[1] - self.rect.centery))
+                self.move(dx, dy, level)
+                return
+        
+        dx = target_x - self.rect.centerx
+        dy = target_y - self.rect.centery
         distance = math.sqrt(dx**2 + dy**2)
         
         if distance > 0:
             dx = dx / distance * self.speed
             dy = dy / distance * self.speed
         
+        self.move(dx, dy, level)
+    
+    def move(self, dx, dy, level):
+        """Сдвигает врага на (dx, dy) с учетом стен"""
+        # Дробную часть сдвига копим, иначе округление уводит врага с линии движения
+        dx += self.remainder_x
+        dy += self.remainder_y
+        step_x = int(dx)
+        step_y = int(dy)
+        self.remainder_x = dx - step_x
+        self.remainder_y = dy - step_y
+        
         # Проверяем движение по осям отдельно для предотвращения "застревания"
         new_rect_x = self.rect.copy()
-        new_rect_x.x += dx
+        new_rect_x.x += step_x
         
         new_rect_y = self.rect.copy()
-        new_rect_y.y += dy
+        new_rect_y.y += step_y
         
         if not self.check_collision(new_rect_x, level):
             self.rect.x = new_rect_x.x
+        else:
+            self.remainder_x = 0.0
             
         if not self.check_collision(new_rect_y, level):
             self.rect.y = new_rect_y.y
+        else:
+            self.remainder_y = 0.0
     
     def idle_movement(self, level):
         """Случайное движение в режиме бездействия"""
         self.idle_timer += 1
         if self.idle_timer >= self.idle_duration:
-            self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+            self.direction = self.random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
             self.idle_timer = 0
-            self.idle_duration = random.randint(60, 120)
+            self.idle_duration = self.random.randint(60, 120)
         
         dx, dy = self.direction
         
@@ -160,10 +238,7 @@ class Enemy(ABC):
     
     def check_collision(self, rect, level):
         """Проверка столкновений со стенами"""
-        for wall in level.walls:
-            if rect.colliderect(wall):
-                return True
-        return False
+        return level.check_wall_collision(rect)
     
     def is_in_light(self, player, level):
         """Проверка, находится ли враг в конусе света фонарика"""
@@ -184,47 +259,49 @@ class Enemy(ABC):
             
         # Проверка, нет ли препятствий между игроком и врагом
         return self.has_line_of_sight(player.rect.centerx, player.rect.centery, 
-                                     self.rect.centerx, self.rect.centery, level.walls)
+                                     self.rect.centerx, self.rect.centery, level)
     
-    def has_line_of_sight(self, x1, y1, x2, y2, walls):
+    def has_line_of_sight(self, x1, y1, x2, y2, level):
         """Проверяет, есть ли прямая видимость между двумя точками"""
-        # Алгоритм Брезенхема для проверки линии
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
-        sx = 1 if x1 < x2 else -1
-        sy = 1 if y1 < y2 else -1
-        err = dx - dy
-        
-        check_rect = pygame.Rect(0, 0, 4, 4)
-        
-        while x1 != x2 or y1 != y2:
-            check_rect.x = x1 - 2
-            check_rect.y = y1 - 2
-            
-            for wall in walls:
-                if wall.colliderect(check_rect):
-                    return False
-                    
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x1 += sx
-            if e2 < dx:
-                err += dx
-                y1 += sy
-                
-        return True
+        # Стены статичны - результат берется из общего кеша видимости уровня
+        return level.has_line_of_sight(x1, y1, x2, y2)
+    
+    @classmethod
+    def draw_alphas(cls):
+        """Все значения прозрачности, с которыми может рисоваться враг этого типа"""
+        return [255]
+    
+    def current_alpha(self):
+        """Прозрачность врага в текущем состоянии"""
+        return self.color[3] if len(self.color) == 4 else 255
+    
+    def _sprite_variant(self, alpha):
+        variant = self.sprite_variants.get(alpha)
+        if variant is None:
+            # Состояние, не указанное в draw_alphas - готовим один раз и запоминаем
+            variant = _bake_alpha(self.sprite, alpha)
+            self.sprite_variants[alpha] = variant
+        return variant
+    
+    def _rect_variant(self, alpha, size):
+        key = (self.color[:3] + (alpha,), size)
+        variant = _rect_variants.get(key)
+        if variant is None:
+            variant = pygame.Surface(size, pygame.SRCALPHA)
+            variant.fill(key[0])
+            _rect_variants[key] = variant
+        return variant
     
     def draw(self, screen, camera):
         """Отрисовка врага с учетом камеры"""
         if not self.visible:
             return
             
-        enemy_rect = camera.apply(self.rect)
+        enemy_rect = camera.apply_moving(self.rect, self.previous_position)
         
         # Проверяем, находится ли враг в пределах экрана
-        if (enemy_rect.right >= 0 and enemy_rect.left <= SCREEN_WIDTH and 
-            enemy_rect.bottom >= 0 and enemy_rect.top <= SCREEN_HEIGHT):
+        if (enemy_rect.right >= 0 and enemy_rect.left <= screen.get_width() and 
+            enemy_rect.bottom >= 0 and enemy_rect.top <= screen.get_height()):
             
             if self.sprite:
                 # Применяем смещение для центрирования спрайта
@@ -235,22 +312,14 @@ class Enemy(ABC):
                     enemy_rect.height + self.sprite_offset_y * 2
                 )
                 
-                # Рисуем спрайт с учетом прозрачности
-                if len(self.color) == 4:
-                    # Создаем копию спрайта с нужной прозрачностью
-                    alpha_sprite = self.sprite.copy()
-                    alpha_sprite.set_alpha(self.color[3])
-                    screen.blit(alpha_sprite, sprite_rect)
-                else:
-                    screen.blit(self.sprite, sprite_rect)
+                # Рисуем заранее подготовленный спрайт с нужной прозрачностью
+                screen.blit(self._sprite_variant(self.current_alpha()), sprite_rect)
             else:
                 # Запасной вариант с цветным прямоугольником
-                # Если у врага есть прозрачность (4 компонента в цвете)
-                if len(self.color) == 4:
-                    # Создаем поверхность с прозрачностью
-                    s = pygame.Surface((enemy_rect.width, enemy_rect.height), pygame.SRCALPHA)
-                    pygame.draw.rect(s, self.color, (0, 0, enemy_rect.width, enemy_rect.height))
-                    screen.blit(s, (enemy_rect.x, enemy_rect.y))
+                alpha = self.current_alpha()
+                if alpha < 255:
+                    # Полупрозрачная поверхность нужного размера (создается один раз)
+                    screen.blit(self._rect_variant(alpha, enemy_rect.size), enemy_rect)
                 else:
                     # Обычная отрисовка для непрозрачных врагов
                     pygame.draw.rect(screen, self.color, enemy_rect)
@@ -259,9 +328,26 @@ class Enemy(ABC):
 class ShadowEnemy(Enemy):
     """Теневой враг - исчезает при попадании света"""
     
-    def __init__(self, x, y, sound_manager=None):
+    SPRITE_NAME = "shadow_enemy"
+    
+    def __init__(self, x, y, sound_manager=None, rng=None):
         super().__init__(x, y, ENEMY_SIZE, SHADOW_ENEMY_SPEED, SHADOW_ENEMY_COLOR, 
-                         "assets/sprites/enemy/tile_0121.png", sound_manager)
+                         self.SPRITE_NAME, sound_manager, rng)
+    
+    @classmethod
+    def draw_alphas(cls):
+        # Непрозрачный спрайт и все кадры исчезновения
+        return [cls.fade_alpha(timer) for timer in range(SHADOW_ENEMY_FADE_TIME + 1)]
+    
+    def current_alpha(self):
+        if self.state == "fading":
+            return self.fade_alpha(self.effect_timer)
+        return 255
+    
+    @staticmethod
+    def fade_alpha(timer):
+        """Прозрачность на кадре исчезновения, когда до конца осталось timer шагов"""
+        return 255 * max(0, timer) // SHADOW_ENEMY_FADE_TIME
     
     def on_light_hit(self):
         """При попадании света начинает исчезать"""
@@ -276,14 +362,21 @@ class ShadowEnemy(Enemy):
 class GhostEnemy(Enemy):
     """Призрачный враг - замедляется при попадании света"""
     
-    def __init__(self, x, y, sound_manager=None):
+    SPRITE_NAME = "ghost_enemy"
+    
+    def __init__(self, x, y, sound_manager=None, rng=None):
         super().__init__(x, y, ENEMY_SIZE, GHOST_ENEMY_SPEED, 
                         (GHOST_ENEMY_COLOR[0], GHOST_ENEMY_COLOR[1], 
                          GHOST_ENEMY_COLOR[2], GHOST_ENEMY_COLOR[3]), 
-                         "assets/sprites/enemy/tile_0108.png", sound_manager)
+                         self.SPRITE_NAME, sound_manager, rng)
         self.normal_speed = GHOST_ENEMY_SPEED
         self.light_speed = GHOST_ENEMY_LIGHT_SPEED
     
+    @classmethod
+    def draw_alphas(cls):
+        # Обычное состояние и оглушение светом
+        return [GHOST_ENEMY_COLOR[3], GHOST_ENEMY_STUNNED_COLOR[3]]
+    
     def on_light_hit(self):
         """При попадании света замедляется"""
         # Воспроизводим базовый звук попадания света
@@ -303,4 +396,10 @@ class GhostEnemy(Enemy):
         if self.state != "affected_by_light" and self.speed != self.normal_speed:
             self.speed = self.normal_speed
             self.color = (GHOST_ENEMY_COLOR[0], GHOST_ENEMY_COLOR[1],
-                          GHOST_ENEMY_COLOR[2], GHOST_ENEMY_COLOR[3])
\ No newline at end of file
+                          GHOST_ENEMY_COLOR[2], GHOST_ENEMY_COLOR[3])
+
+
+def preload_enemy_sprites():
+    """Готовит спрайты всех типов врагов во всех состояниях прозрачности (при создании уровня)"""
+    for enemy_type in (ShadowEnemy, GhostEnemy):
+        bake_sprite_variants(enemy_type.SPRITE_NAME, enemy_type.draw_alphas())
@@ -2,17 +2,23 @@ import pygame
 import math
 from settings import *
 from entities.lighting import Flashlight
+from utils.input_source import KeyboardInput
+from utils.asset_manager import assets
 
 
 class Player:
-    def __init__(self, x=100, y=100, sound_manager=None):
+    def __init__(self, x=100, y=100, sound_manager=None, input_source=None):
         self.rect = pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE)
+        self.previous_position = self.rect.topleft  # Положение на прошлом шаге логики
         self.speed = PLAYER_SPEED
         self.flashlight = Flashlight(self.rect.centerx, self.rect.centery)
         
         # Добавляем звуковой менеджер
         self.sound_manager = sound_manager
         
+        # Источник ввода: клавиатура или сценарий/случайный ввод при прогоне без окна
+        self.input_source = input_source or KeyboardInput()
+        
         # Для воспроизведения звука шагов
         self.last_footstep_time = 0
         self.footstep_delay = 350  # миллисекунды между шагами
@@ -24,10 +30,9 @@ class Player:
         self.animation_speed = 8  # Меняем кадр каждые 8 обновлений
         self.animation_frame = 0
         
-        # Загружаем базовый спрайт игрока
-        self.base_sprite = pygame.image.load("assets/sprites/player/tile_0097.png").convert_alpha()
-        sprite_size = int(PLAYER_SIZE * 2.2)
-        self.base_sprite = pygame.transform.scale(self.base_sprite, (sprite_size, sprite_size))
+        # Базовый спрайт игрока (общий, из менеджера ресурсов)
+        self.base_sprite = assets.sprite("player")
+        sprite_size = self.base_sprite.get_width()
         
         # Создаём словарь спрайтов для разных направлений
         self.sprites = {
@@ -57,13 +62,14 @@ class Player:
         # Центрируем повёрнутый спрайт
         return frame
 
-    def handle_input(self, events, level, camera):
-        keys = pygame.key.get_pressed()
+    def update(self, level, camera):
+        """Шаг логики игрока: движение по зажатым клавишам и обновление фонарика"""
+        self.previous_position = self.rect.topleft
+        self.input_source.update()
+        keys = self.input_source.get_pressed()
         
-        # Получаем позицию мыши и преобразуем с учетом камеры
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_x = mouse_pos[0] + camera.rect.x
-        mouse_y = mouse_pos[1] + camera.rect.y
+        # Получаем позицию мыши и переводим ее в координаты мира (с учетом масштаба камеры)
+        mouse_x, mouse_y = camera.screen_to_world(*self.input_source.get_mouse_pos())
         
         # Обновление фонарика
         self.flashlight.update(mouse_x, mouse_y, self.rect.centerx, self.rect.centery)
@@ -119,14 +125,11 @@ class Player:
                 self.rect.y = new_rect.y
 
     def check_collision(self, rect, level):
-        for wall in level.walls:
-            if rect.colliderect(wall):
-                return True
-        return False
+        return level.check_wall_collision(rect)
 
     def draw(self, screen, camera, level):
         # Отрисовка игрока со спрайтом с учетом камеры
-        player_rect = camera.apply(self.rect)
+        player_rect = camera.apply_moving(self.rect, self.previous_position)
         
         # Выбираем текущий кадр анимации
         current_sprite = self.animation_frames[self.direction][self.animation_frame]
@@ -0,0 +1,96 @@
+import math
+import numpy as np
+import pygame
+
+# Смещение угла для лучей, проходящих мимо углов стен
+CORNER_EPSILON = 0.0005
+# Шаг дуги на границе радиуса, где лучи не упираются в стены
+ARC_STEP = math.radians(1.5)
+
+
+def _slab(origin, direction, low, high):
+    """Интервалы входа/выхода лучей (столбец) для слоев стен (строка)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (low - origin) / direction
+        t2 = (high - origin) / direction
+    near = np.minimum(t1, t2)
+    far = np.maximum(t1, t2)
+
+    # Лучи, параллельные слою, либо всегда внутри него, либо никогда
+    parallel = direction == 0
+    inside = (origin >= low) & (origin < high)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), near)
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), far)
+    return near, far
+
+
+def cast_rays(x, y, angles, max_distance, walls):
+    """Пакетно бросает лучи из (x, y) по углам angles и возвращает расстояния до первой стены (не больше max_distance)"""
+    # walls - массив NumPy (x, y, w, h); пересечения всех лучей со всеми стенами - одна операция над матрицей
+    angles = np.asarray(angles, dtype=float)
+    distances = np.full(angles.shape, float(max_distance))
+    if len(walls) == 0 or len(angles) == 0:
+        return distances
+
+    dir_x = np.cos(angles)[:, None]
+    dir_y = np.sin(angles)[:, None]
+    left = walls[:, 0]
+    top = walls[:, 1]
+    right = left + walls[:, 2]
+    bottom = top + walls[:, 3]
+
+    near_x, far_x = _slab(x, dir_x, left, right)
+    near_y, far_y = _slab(y, dir_y, top, bottom)
+    t_near = np.maximum(near_x, near_y)
+    t_far = np.minimum(far_x, far_y)
+
+    hit = (t_near <= t_far) & (t_far >= 0)
+    t_hit = np.where(hit, np.maximum(t_near, 0.0), np.inf)
+    return np.minimum(distances, t_hit.min(axis=1))
+
+
+def compute_visibility_polygon(level, x, y, direction, cone_angle, radius):
+    """Точный полигон освещенной области конуса света (точки в мировых координатах, начиная с источника)"""
+    # Лучи - только к углам стен (и чуть мимо них), к краям конуса и вдоль дуги: между ними граница прямолинейна
+    if radius <= 0:
+        return []
+
+    start = direction - cone_angle / 2
+
+    # Края конуса и равномерные точки дуги
+    arc_steps = max(1, int(math.ceil(cone_angle / ARC_STEP)))
+    arc_offsets = np.linspace(0.0, cone_angle, arc_steps + 1)
+
+    # Стены, которые могут оказаться в радиусе света
+    left = math.floor(x - radius)
+    top = math.floor(y - radius)
+    area = pygame.Rect(left, top, math.ceil(x + radius) - left + 1, math.ceil(y + radius) - top + 1)
+    walls = level.wall_array[level.wall_grid.query_rect_indices(area)]
+
+    # Углы стен в пределах радиуса и конуса
+    left = walls[:, 0]
+    top = walls[:, 1]
+    right = left + walls[:, 2]
+    bottom = top + walls[:, 3]
+    corner_x = np.concatenate((left, right, left, right)) - x
+    corner_y = np.concatenate((top, top, bottom, bottom)) - y
+    in_radius = corner_x * corner_x + corner_y * corner_y <= radius * radius
+    corner_offsets = (np.arctan2(corner_y[in_radius], corner_x[in_radius]) - start) % (2 * math.pi)
+    corner_offsets = corner_offsets[corner_offsets <= cone_angle]
+
+    # По лучу к каждому углу и по лучу с каждой стороны от него
+    offsets = np.concatenate((arc_offsets,
+                              corner_offsets - CORNER_EPSILON,
+                              corner_offsets,
+                              corner_offsets + CORNER_EPSILON))
+    offsets = np.unique(offsets[(offsets >= 0.0) & (offsets <= cone_angle)])
+
+    # Все лучи обрабатываются одним пакетом
+    angles = start + offsets
+    distances = cast_rays(x, y, angles, radius, walls)
+    hit_x = x + np.cos(angles) * distances
+    hit_y = y + np.sin(angles) * distances
+
+    polygon = [(x, y)]
+    polygon.extend(zip(hit_x.tolist(), hit_y.tolist()))
+    return polygon
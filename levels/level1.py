@@ -1,16 +1,38 @@
 import pygame
 import random
 import math
+import numpy as np
+from array import array
 from settings import *
 from utils.enemy_manager import EnemyManager
 from levels.room import Room
+from levels.level_cache import load_level, save_level
+from levels.wall_layer import WallLayer
+from levels.tile_map import TileMap, TILE_SOLID, TILE_OBSTACLE, TILE_DOOR
+from utils.spatial_grid import SpatialGrid, ray_rect_distance
+from utils.los_cache import LineOfSightCache
+from utils.flow_field import FlowField
+from utils.region_planner import RegionPlanner
+from utils.asset_manager import assets
+from entities.enemy import preload_enemy_sprites
 
 
 class Level1:
-    def __init__(self, sound_manager=None):
+    def __init__(self, sound_manager=None, seed=None, use_cache=None):
         # Сохраняем звуковой менеджер
         self.sound_manager = sound_manager
         
+        # Кеш на диске - только для заданного зерна: случайные карты второй раз не встретятся
+        if use_cache is None:
+            use_cache = seed is not None
+        use_cache = use_cache and LEVEL_CACHE_ENABLED
+        
+        # Зерно генерации: при одном и том же зерне получается та же карта и те же враги
+        if seed is None:
+            seed = random.randrange(1000000)
+        self.seed = seed
+        self.random = random.Random(seed)
+        
         # Создаем большую карту подземелья
         self.width = MAP_WIDTH
         self.height = MAP_HEIGHT
@@ -19,9 +41,53 @@ class Level1:
         self.rooms = []
         self.corridors = []
         
-        # Все стены (включая стены комнат и коридоров)
-        self.walls = []
+        # Граф смежности комнат: индекс комнаты -> индексы соединенных с ней комнат
+        self.room_graph = {}
+        # Для каждого коридора - индексы двух комнат, которые он соединяет
+        self.corridor_links = []
+        
+        # Все стены (включая стены комнат и коридоров) - строятся из сетки клеток по запросу
+        self._walls = None
+        self.obstacles = []
+        self.wall_merge_stats = {}
+        
+        # Раскладка уровня: из кеша по зерну или генерацией с нуля
+        layout = load_level(seed) if use_cache else None
+        if layout is None:
+            self._generate_layout()
+            if use_cache:
+                save_level(self)
+        else:
+            self._restore_layout(layout)
+        
+        # Состояние игры: свои генераторы случайных чисел (не зависят от того, загружен ли уровень из кеша)
+        self.random = random.Random(self.runtime_seed)
+        for room in self.rooms:
+            room.random = random.Random(self.random.getrandbits(32))
         
+        # Батарейки для пополнения заряда
+        self.batteries = []
+        self._collect_batteries()
+        
+        # Менеджер врагов
+        self.enemy_manager = EnemyManager(self, sound_manager, self.random.getrandbits(32))
+        self.enemy_manager.spawn_points = list(self.spawn_points)
+        
+        # Позиция старта игрока (центр стартовой комнаты)
+        self.start_position = self._get_start_position()
+        
+        # Слой стен, отрисованный кусками по мере приближения камеры (создается под масштаб камеры)
+        self.wall_layer = None
+    
+        # Загрузка спрайтов для игровых объектов
+        self.battery_sprite = None
+        self.exit_sprites = []  # Список для кадров анимации портала
+        self.exit_frame = 0     # Текущий кадр анимации
+        self.exit_animation_timer = 0  # Таймер для управления скоростью анимации
+        self._load_sprites()
+    
+    def _generate_layout(self):
+        """Генерирует карту, комнаты, коридоры, точки спавна, выход и графы путей"""
         # Заполняем всю карту стенами (сплошным камнем)
         self._fill_map_with_walls()
         
@@ -35,45 +101,79 @@ class Level1:
         # Собираем все стены из комнат и коридоров
         self._collect_walls()
         
-        # Батарейки для пополнения заряда
-        self.batteries = []
-        self._collect_batteries()
+        # Карта областей: какой комнате или коридору принадлежит каждая клетка
+        self._build_region_map()
         
-        # Менеджер врагов
-        self.enemy_manager = EnemyManager(self, sound_manager)
-        self._setup_enemies()
+        # Пространственный индекс стен для запросов коллизий и видимости
+        self._build_wall_grid()
         
-        # Позиция старта игрока (центр стартовой комнаты)
-        self.start_position = self._get_start_position()
+        # Точки спавна врагов
+        self.spawn_points = self._setup_enemies()
         
         # Выход с уровня (центр финальной комнаты)
         self.exit = self._create_exit()
+        
+        # Общее поле путей к игроку для преследующих врагов и граф комнат для дальних маршрутов
+        self.flow_field = FlowField(self.tile_map, self.check_wall_collision, ENEMY_SIZE,
+                                    radius=ENEMY_PATH_FIELD_RADIUS)
+        self.region_planner = RegionPlanner(self.flow_field, self.region_map)
+        
+        # Зерно для случайностей во время игры - продолжение того же генератора
+        self.runtime_seed = self.random.getrandbits(32)
     
-        # Загрузка спрайтов для игровых объектов
-        self.battery_sprite = None
-        self.exit_sprites = []  # Список для кадров анимации портала
-        self.exit_frame = 0     # Текущий кадр анимации
-        self.exit_animation_timer = 0  # Таймер для управления скоростью анимации
-        self._load_sprites()
+    def _restore_layout(self, layout):
+        """Восстанавливает уровень из кеша без повторной генерации"""
+        self.tile_map = TileMap(self.width, self.height, layout["tile_size"])
+        self.tile_map.tiles[:] = layout["tiles"]
+        
+        self.rooms = [Room.restore(room["rect"], room["type"], room["doors"], room["obstacles"],
+                                   room["batteries"], room["enemy_spawn_points"])
+                      for room in layout["rooms"]]
+        self.corridors = layout["corridors"]
+        self.corridor_links = layout["corridor_links"]
+        for index1, index2 in self.corridor_links:
+            self.room_graph.setdefault(index1, set()).add(index2)
+            self.room_graph.setdefault(index2, set()).add(index1)
+        
+        self.obstacles = layout["obstacles"]
+        self._walls = None
+        self._build_region_map()
+        self._build_wall_grid()
+        
+        self.spawn_points = layout["spawn_points"]
+        self.exit = layout["exit"]
+        self.runtime_seed = layout["runtime_seed"]
+        
+        self.flow_field = FlowField(self.tile_map, self.check_wall_collision, ENEMY_SIZE,
+                                    radius=ENEMY_PATH_FIELD_RADIUS, graph=(layout["anchors"], layout["links"]))
+        self.region_planner = RegionPlanner(self.flow_field, self.region_map,
+                                            layout=(layout["regions"], layout["doors"], layout["local_fields"]))
+    
+    @property
+    def walls(self):
+        """Список прямоугольников стен, построенный из сетки клеток при первом обращении"""
+        if self._walls is None:
+            self._walls = self._build_walls()
+        return self._walls
     
     def _fill_map_with_walls(self):
         """Заполняет всю карту стенами (сплошным камнем)"""
         # Размер блока стены
         block_size = 50
         
-        # Создаем сетку стен, заполняющую всю карту
-        self.solid_walls = []
-        for x in range(0, self.width, block_size):
-            for y in range(0, self.height, block_size):
+        # Создаем сетку клеток, заполняющую всю карту
+        self.tile_map = TileMap(self.width, self.height, block_size)
+        for col, x in enumerate(range(0, self.width, block_size)):
+            for row, y in enumerate(range(0, self.height, block_size)):
                 # Внешний край карты делаем толще
                 if (x < WALL_THICKNESS or x > self.width - WALL_THICKNESS - block_size or 
                     y < WALL_THICKNESS or y > self.height - WALL_THICKNESS - block_size):
-                    self.solid_walls.append(pygame.Rect(x, y, block_size, block_size))
+                    self.tile_map.set(col, row, TILE_SOLID)
                 else:
                     # Внутренние стены с вероятностью 90% (было 95%)
                     # Это создаст немного более просторные "естественные пещеры" среди стен
-                    if random.random() < 0.90:
-                        self.solid_walls.append(pygame.Rect(x, y, block_size, block_size))
+                    if self.random.random() < 0.90:
+                        self.tile_map.set(col, row, TILE_SOLID)
     
     def _generate_rooms(self):
         """Генерирует комнаты разных типов с увеличенным размером"""
@@ -96,14 +196,14 @@ class Level1:
         for i in range(grid_cols):
             for j in range(grid_rows):
                 # Пропускаем некоторые комнаты для разнообразия, если они не обязательные
-                if (i, j) not in must_have_cells and random.random() < 0.2:
+                if (i, j) not in must_have_cells and self.random.random() < 0.2:
                     continue
                     
                 # Определяем тип комнаты
                 room_type = room_types.get((i, j), "normal")
                 
                 # С вероятностью 25% обычная комната может стать сложной
-                if room_type == "normal" and random.random() < 0.25:
+                if room_type == "normal" and self.random.random() < 0.25:
                     room_type = "difficult"
                 
                 if room_type == "start":
@@ -113,8 +213,8 @@ class Level1:
                     width = int(cell_width * 0.70)  
                     height = int(cell_height * 0.70)  
                 else:
-                    width = int(cell_width * random.uniform(0.60, 0.80))  
-                    height = int(cell_height * random.uniform(0.60, 0.80))  
+                    width = int(cell_width * self.random.uniform(0.60, 0.80))  
+                    height = int(cell_height * self.random.uniform(0.60, 0.80))  
                 
                 # Координаты комнаты (с отступом от краев ячейки для коридоров)
                 padding_x = (cell_width - width) // 2
@@ -123,7 +223,7 @@ class Level1:
                 y = j * cell_height + padding_y
                 
                 # Создаем комнату
-                room = Room(x, y, width, height, room_type)
+                room = Room(x, y, width, height, room_type, random.Random(self.random.getrandbits(32)))
                 self.rooms.append(room)
                 
                 # Добавляем батарейки в комнату
@@ -132,7 +232,7 @@ class Level1:
                 elif room_type == "difficult":
                     room.add_battery(2)  # Две батарейки в сложной комнате
                 elif room_type == "normal":
-                    room.add_battery(1 if random.random() < 0.7 else 0)  # 70% шанс батарейки
+                    room.add_battery(1 if self.random.random() < 0.7 else 0)  # 70% шанс батарейки
         
         # Вырезаем комнаты из сплошных стен
         self._carve_rooms_from_walls()
@@ -150,8 +250,7 @@ class Level1:
             )
             
             # Удаляем стены внутри комнаты
-            self.solid_walls = [wall for wall in self.solid_walls 
-                              if not carve_rect.contains(wall)]
+            self.tile_map.carve_contained(carve_rect)
     
     def _connect_rooms(self):
         """Соединяет комнаты коридорами, вырезая проходы в сплошном камне"""
@@ -169,7 +268,10 @@ class Level1:
             shortest_distance = float('inf')
             
             # Ищем ближайшую несоединенную комнату к любой соединенной
-            for room1 in connected:
+            # (в порядке списка комнат, а не множества - иначе при равных расстояниях карта зависит от запуска)
+            for room1 in self.rooms:
+                if room1 not in connected:
+                    continue
                 for room2 in self.rooms:
                     if room2 in connected:
                         continue
@@ -191,7 +293,7 @@ class Level1:
         for _ in range(2):  # Добавляем 2 случайных дополнительных коридора
             # Выбираем две случайные комнаты
             if len(self.rooms) >= 2:
-                room1, room2 = random.sample(self.rooms, 2)
+                room1, room2 = self.random.sample(self.rooms, 2)
                 # Если это не одна и та же комната и они не соединены напрямую
                 if room1 != room2:
                     self._create_corridor(room1, room2)
@@ -206,6 +308,13 @@ class Level1:
         corridor_rect = self._create_corridor_rect(start_x, start_y, end_x, end_y)
         self.corridors.append(corridor_rect)
         
+        # Запоминаем соединение в графе комнат
+        index1 = self.rooms.index(room1)
+        index2 = self.rooms.index(room2)
+        self.corridor_links.append((index1, index2))
+        self.room_graph.setdefault(index1, set()).add(index2)
+        self.room_graph.setdefault(index2, set()).add(index1)
+        
         # Вырезаем коридор из сплошных стен
         self._carve_corridor_from_walls(corridor_rect)
         
@@ -235,7 +344,7 @@ class Level1:
         
         # Определяем, будет ли поворот сначала по горизонтали, затем по вертикали,
         # или наоборот (случайно, для разнообразия)
-        if random.random() < 0.5:
+        if self.random.random() < 0.5:
             # Сначала горизонтальный участок, затем вертикальный
             bend_x = end_x
             bend_y = start_y
@@ -283,13 +392,25 @@ class Level1:
     def _carve_corridor_from_walls(self, corridor_rect):
         """Вырезает коридор из сплошных стен"""
         # Удаляем все стены, которые перекрываются с коридором
-        self.solid_walls = [wall for wall in self.solid_walls
-                           if not corridor_rect.contains(wall) and not wall.colliderect(corridor_rect)]
+        self.tile_map.carve_overlapping(corridor_rect)
     
     def _collect_walls(self):
-        """Собирает все стены для обработки коллизий"""
+        """Собирает препятствия и двери комнат в сетку клеток"""
+        self.obstacles = []
+        for room in self.rooms:
+            self.obstacles.extend(room.obstacles)
+            for obstacle in room.obstacles:
+                self.tile_map.mark_overlapping(obstacle, TILE_OBSTACLE)
+            for door in room.doors:
+                self.tile_map.mark_overlapping(door["rect"], TILE_DOOR)
+        
+        # Список стен будет построен заново при следующем обращении
+        self._walls = None
+    
+    def _build_walls(self):
+        """Строит список стен для обработки коллизий из сетки клеток"""
         # Сначала добавляем внешние стены карты
-        self.walls = [
+        walls = [
             # Верхняя граница
             pygame.Rect(0, 0, self.width, WALL_THICKNESS),
             # Левая граница
@@ -300,13 +421,110 @@ class Level1:
             pygame.Rect(self.width - WALL_THICKNESS, 0, WALL_THICKNESS, self.height)
         ]
         
-        # Добавляем все оставшиеся сплошные стены
-        self.walls.extend(self.solid_walls)
+        # Добавляем все оставшиеся сплошные стены, объединенные в крупные прямоугольники
+        solid_rects = self.tile_map.solid_rects()
+        walls.extend(solid_rects)
         
         # Добавляем препятствия внутри комнат
-        for room in self.rooms:
-            for obstacle in room.obstacles:
-                self.walls.append(obstacle)
+        walls.extend(self.obstacles)
+        
+        # Статистика объединения: сколько блоков было и сколько прямоугольников осталось
+        block_count = self.tile_map.count(TILE_SOLID)
+        self.wall_merge_stats = {
+            "blocks": block_count,
+            "merged": len(solid_rects),
+            "walls_before": len(walls) - len(solid_rects) + block_count,
+            "walls_after": len(walls)
+        }
+        return walls
+    
+    def _build_wall_grid(self):
+        """Строит пространственный хеш и массив (x, y, w, h) по текущему списку стен"""
+        self.wall_grid = SpatialGrid(self.walls)
+        # Видимость зависит от стен - при перестроении индекса кеш начинается заново
+        self.los_cache = LineOfSightCache(self)
+        self.wall_array = np.array([(wall.x, wall.y, wall.width, wall.height) for wall in self.walls],
+                                   dtype=float).reshape(-1, 4)
+    
+    def check_wall_collision(self, rect):
+        """Проверяет, пересекается ли прямоугольник со стенами уровня"""
+        return self.wall_grid.collides(rect)
+    
+    def _build_region_map(self):
+        """Заполняет сетку областей: номер комнаты или len(rooms) + номер коридора"""
+        tile_map = self.tile_map
+        self.region_map = array('h', [-1]) * (tile_map.cols * tile_map.rows)
+        size = tile_map.tile_size
+        half = size // 2
+        
+        # Сначала коридоры, затем комнаты - комната важнее, если они перекрываются
+        areas = [(len(self.rooms) + i, corridor) for i, corridor in enumerate(self.corridors)]
+        areas.extend((i, room.rect) for i, room in enumerate(self.rooms))
+        for region, rect in areas:
+            col_start = max(0, (rect.left - half + size - 1) // size)
+            col_end = min(tile_map.cols, (rect.right - half + size - 1) // size)
+            row_start = max(0, (rect.top - half + size - 1) // size)
+            row_end = min(tile_map.rows, (rect.bottom - half + size - 1) // size)
+            # Клетка принадлежит области, если ее центр внутри прямоугольника области
+            row_fill = array('h', [region]) * max(0, col_end - col_start)
+            for row in range(row_start, row_end):
+                offset = row * tile_map.cols
+                self.region_map[offset + col_start:offset + col_end] = row_fill
+    
+    def get_region(self, x, y):
+        """O(1) поиск области (с точностью до клетки), в которой находится точка (-1 - вне комнат и коридоров)"""
+        tile_map = self.tile_map
+        col = int(x // tile_map.tile_size)
+        row = int(y // tile_map.tile_size)
+        if not tile_map.in_bounds(col, row):
+            return -1
+        return self.region_map[row * tile_map.cols + col]
+    
+    def get_region_room(self, region):
+        """Комната области или None, если область - коридор"""
+        if 0 <= region < len(self.rooms):
+            return self.rooms[region]
+        return None
+    
+    def get_adjacent_rooms(self, region):
+        """Комнаты, соединенные с областью коридорами"""
+        if 0 <= region < len(self.rooms):
+            return [self.rooms[i] for i in sorted(self.room_graph.get(region, ()))]
+        if region >= len(self.rooms):
+            return [self.rooms[i] for i in self.corridor_links[region - len(self.rooms)]]
+        return []
+    
+    def tile_hit_distance(self, col, row, tile, x, y, dir_x, dir_y, t_enter, t_exit):
+        """Расстояние, на котором луч упирается в стену внутри клетки, или None"""
+        if tile == TILE_SOLID:
+            return t_enter
+        if tile == TILE_OBSTACLE:
+            # Препятствия не выровнены по сетке - проверяем их прямоугольники в пределах клетки
+            obstacle_hit = None
+            for obstacle in self.wall_grid.query_rect(self.tile_map.tile_rect(col, row)):
+                t = ray_rect_distance(x, y, dir_x, dir_y, obstacle)
+                if t is not None and t <= t_exit and (obstacle_hit is None or t < obstacle_hit):
+                    obstacle_hit = t
+            return obstacle_hit
+        return None
+    
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Проверяет прямую видимость между двумя точками через общий кеш видимости"""
+        return self.los_cache.has_line_of_sight(x1, y1, x2, y2)
+    
+    def has_clear_path(self, x1, y1, x2, y2, size):
+        """Проверяет, пройдет ли квадрат размера size по прямой между двумя точками"""
+        return not self.wall_grid.query_segment(x1, y1, x2, y2, padding=(size + 1) // 2)
+    
+    def is_wall_at(self, x, y):
+        """Проверяет, находится ли точка внутри стены или препятствия"""
+        tile = self.tile_map.tile_at(x, y)
+        if tile == TILE_SOLID:
+            return True
+        if tile == TILE_OBSTACLE:
+            # Препятствия не выровнены по сетке - уточняем по индексу стен
+            return self.wall_grid.collides(pygame.Rect(x, y, 1, 1))
+        return False
     
     def _collect_batteries(self):
         """Собирает все батарейки из комнат"""
@@ -336,7 +554,7 @@ class Level1:
                 )
                 
                 # Проверяем коллизии со ВСЕМИ стенами уровня
-                if not any(enemy_rect.colliderect(wall) for wall in self.walls):
+                if not self.check_wall_collision(enemy_rect):
                     # Также проверяем, не находится ли точка спавна внутри припятствий других комнат
                     in_other_room_obstacle = False
                     for other_room in self.rooms:
@@ -357,17 +575,17 @@ class Level1:
                 if room.type == "difficult":
                     spawn_count = min(3, len(valid_spawn_points))
                     if spawn_count > 0:
-                        selected_points = random.sample(valid_spawn_points, spawn_count)
+                        selected_points = self.random.sample(valid_spawn_points, spawn_count)
                         spawn_points.extend(selected_points)
                 # В обычных комнатах врагов меньше
                 elif room.type == "normal":
                     spawn_count = min(1, len(valid_spawn_points))
                     if spawn_count > 0:
-                        selected_points = random.sample(valid_spawn_points, spawn_count)
+                        selected_points = self.random.sample(valid_spawn_points, spawn_count)
                         spawn_points.extend(selected_points)
         
-        # Передаем очищенный список точек спавна менеджеру врагов
-        self.enemy_manager.spawn_points = spawn_points
+        # Очищенный список точек спавна для менеджера врагов
+        return spawn_points
     
     def _get_start_position(self):
         """Возвращает начальную позицию игрока (центр стартовой комнаты)"""
@@ -392,7 +610,7 @@ class Level1:
             )
             
             # Если выход в стене, ищем безопасное место в комнате
-            if any(exit_rect.colliderect(wall) for wall in self.walls):
+            if self.check_wall_collision(exit_rect):
                 # Пробуем несколько позиций внутри комнаты
                 for offset_x in range(-50, 51, 25):
                     for offset_y in range(-50, 51, 25):
@@ -406,7 +624,7 @@ class Level1:
                                 EXIT_SIZE, EXIT_SIZE
                             )
                             
-                            if not any(test_rect.colliderect(wall) for wall in self.walls):
+                            if not self.check_wall_collision(test_rect):
                                 return test_rect
                 
                 # Если не нашли безопасное место, создаем безопасную зону
@@ -417,7 +635,17 @@ class Level1:
                 )
                 
                 # Удаляем все стены в области выхода
-                self.walls = [wall for wall in self.walls if not safe_area.colliderect(wall)]
+                self.tile_map.carve_overlapping(safe_area)
+                self.obstacles = [obstacle for obstacle in self.obstacles
+                                  if not safe_area.colliderect(obstacle)]
+                # Вырезаны все клетки под областью - оставшиеся препятствия и двери помечаются заново
+                for obstacle in self.obstacles:
+                    self.tile_map.mark_overlapping(obstacle, TILE_OBSTACLE)
+                for room in self.rooms:
+                    for door in room.doors:
+                        self.tile_map.mark_overlapping(door["rect"], TILE_DOOR)
+                self._walls = None
+                self._build_wall_grid()
                 
                 # Возвращаем исходную позицию выхода, которая теперь безопасна
                 return exit_rect
@@ -433,7 +661,7 @@ class Level1:
             # Выбираем случайную комнату типа "normal" или "difficult"
             eligible_rooms = [r for r in self.rooms if r.type in ["normal", "difficult"]]
             if eligible_rooms:
-                room = random.choice(eligible_rooms)
+                room = self.random.choice(eligible_rooms)
                 room.add_battery(1)
                 self._collect_batteries()  # Обновляем общий список батареек
                 return True
@@ -445,11 +673,7 @@ class Level1:
             for room in self.rooms:
                 if room.rect.contains(battery_rect):
                     # Проверяем коллизии со стенами и объектами
-                    collision = False
-                    for wall in self.walls:
-                        if battery_rect.colliderect(wall):
-                            collision = True
-                            break
+                    collision = self.check_wall_collision(battery_rect)
                     
                     if not collision:
                         for other_battery in self.batteries:
@@ -476,7 +700,7 @@ class Level1:
                 self.batteries.remove(battery)
                 
                 # Шанс появления новой батарейки в другом месте (30%)
-                if random.random() < 0.3:
+                if self.random.random() < 0.3:
                     self.add_battery()
         
         # Проверка достижения выхода
@@ -498,19 +722,16 @@ class Level1:
         # Рисуем пол подземелья
         screen.fill(DUNGEON_FLOOR)
         
-        # Стены - рисуем только те, что видны на экране
-        for wall in self.walls:
-            wall_rect = camera.apply(wall)
-            # Проверяем, находится ли стена в пределах экрана
-            if (wall_rect.right >= 0 and wall_rect.left <= SCREEN_WIDTH and 
-                wall_rect.bottom >= 0 and wall_rect.top <= SCREEN_HEIGHT):
-                pygame.draw.rect(screen, WALL_COLOR, wall_rect)
+        # Стены - готовый слой, копируем только видимую часть
+        if self.wall_layer is None:
+            self.wall_layer = WallLayer(self.width, self.height, self.wall_grid)
+        self.wall_layer.draw(screen, camera)
         
         # Батарейки - рисуем только видимые
         for battery in self.batteries:
             battery_rect = camera.apply(battery)
-            if (battery_rect.right >= 0 and battery_rect.left <= SCREEN_WIDTH and 
-                battery_rect.bottom >= 0 and battery_rect.top <= SCREEN_HEIGHT):
+            if (battery_rect.right >= 0 and battery_rect.left <= screen.get_width() and 
+                battery_rect.bottom >= 0 and battery_rect.top <= screen.get_height()):
                 if self.battery_sprite:
                     # Применяем смещение для центрирования
                     sprite_rect = pygame.Rect(
@@ -528,8 +749,8 @@ class Level1:
         
         # Выход с анимацией
         exit_rect = camera.apply(self.exit)
-        if (exit_rect.right >= 0 and exit_rect.left <= SCREEN_WIDTH and 
-            exit_rect.bottom >= 0 and exit_rect.top <= SCREEN_HEIGHT):
+        if (exit_rect.right >= 0 and exit_rect.left <= screen.get_width() and 
+            exit_rect.bottom >= 0 and exit_rect.top <= screen.get_height()):
             if self.exit_sprites:
                 # Выбираем текущий кадр анимации
                 current_sprite = self.exit_sprites[self.exit_frame]
@@ -617,25 +838,16 @@ class Level1:
     def _load_sprites(self):
         """Загружает спрайты для игровых объектов"""
         try:
-            # Загружаем спрайт батарейки
-            self.battery_sprite = pygame.image.load("assets/sprites/items/battery.png").convert_alpha()
-            
-            # Увеличиваем размер батарейки (в 1.5 раза)
-            battery_size = int(BATTERY_SIZE * 1.5)
-            self.battery_sprite = pygame.transform.scale(self.battery_sprite, (battery_size, battery_size))
-            self.battery_offset = (battery_size - BATTERY_SIZE) // 2
-            
-            # Загружаем кадры анимации портала
-            portal1 = pygame.image.load("assets/sprites/items/portalRings1.png").convert_alpha()
-            portal2 = pygame.image.load("assets/sprites/items/portalRings2.png").convert_alpha()
+            # Спрайт батарейки (увеличенный в 1.5 раза, из менеджера ресурсов)
+            self.battery_sprite = assets.sprite("battery")
+            self.battery_offset = (self.battery_sprite.get_width() - BATTERY_SIZE) // 2
             
-            # Увеличиваем размер портала (в 2 раза)
-            exit_size = EXIT_SIZE * 2
-            portal1 = pygame.transform.scale(portal1, (exit_size, exit_size))
-            portal2 = pygame.transform.scale(portal2, (exit_size, exit_size))
+            # Кадры анимации портала (увеличенные в 2 раза)
+            self.exit_sprites = [assets.sprite("portal1"), assets.sprite("portal2")]
+            self.exit_offset = (self.exit_sprites[0].get_width() - EXIT_SIZE) // 2
             
-            self.exit_sprites = [portal1, portal2]
-            self.exit_offset = (exit_size - EXIT_SIZE) // 2
+            # Варианты спрайтов врагов - до их первого появления
+            preload_enemy_sprites()
             
         except Exception as e:
             print(f"Ошибка загрузки спрайтов: {e}")
@@ -0,0 +1,282 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+import pygame
+from settings import *
+from utils.flow_field import RegionDistances
+
+# Версия формата файла (изменения генератора учитываются хешем его исходников)
+LEVEL_CACHE_VERSION = 2
+MAGIC = b"LGLV"
+# Заголовок: сигнатура, версия, ключ параметров генератора
+HEADER = struct.Struct("<4sH16s")
+# Заголовок секции: тип элементов (код array) и их количество
+SECTION = struct.Struct("<cI")
+
+ROOM_TYPES = ("start", "normal", "difficult", "exit")
+DOOR_DIRECTIONS = ("top", "right", "bottom", "left")
+
+# Модули, от которых зависит содержимое файла кеша (пути от корня игры)
+GENERATOR_SOURCES = ("levels/level1.py", "levels/room.py", "levels/tile_map.py", "levels/level_cache.py",
+                     "utils/flow_field.py", "utils/region_planner.py")
+_generator_hash = None
+
+
+def generator_hash():
+    """Хеш исходников генератора: после любой правки генерации старые файлы кеша не подходят"""
+    global _generator_hash
+    if _generator_hash is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.md5()
+        for source in GENERATOR_SOURCES:
+            with open(os.path.join(root, source), "rb") as source_file:
+                digest.update(source_file.read())
+        _generator_hash = digest.hexdigest()
+    return _generator_hash
+
+
+def cache_key(seed):
+    """Ключ уровня: зерно и все параметры, от которых зависит генерация"""
+    params = (LEVEL_CACHE_VERSION, generator_hash(), seed, MAP_WIDTH, MAP_HEIGHT, WALL_THICKNESS, PLAYER_SIZE,
+              ENEMY_SIZE, BATTERY_SIZE, EXIT_SIZE, ENEMY_PATH_FIELD_RADIUS, sys.byteorder)
+    return hashlib.md5(repr(params).encode()).digest()
+
+
+def cache_path(seed):
+    return os.path.join(LEVEL_CACHE_DIR, f"level_{seed}_{cache_key(seed).hex()[:12]}.bin")
+
+
+def _section(typecode, values):
+    data = array(typecode, values)
+    return SECTION.pack(typecode.encode(), len(data)) + data.tobytes()
+
+
+def _rects(rects):
+    return [value for rect in rects for value in (rect.x, rect.y, rect.width, rect.height)]
+
+
+def _points(points):
+    return [value for point in points for value in point]
+
+
+def save_level(level):
+    """Сохраняет раскладку уровня и графы путей в бинарный файл кеша"""
+    # Пишется во временный файл и переименовывается, чтобы параллельный загрузчик не прочитал файл наполовину
+    rooms = level.rooms
+    flow_field = level.flow_field
+    planner = level.region_planner
+    tile_map = level.tile_map
+
+    room_info = []
+    doors = []
+    for room in rooms:
+        room_info.extend((*room.rect, ROOM_TYPES.index(room.type), len(room.doors), len(room.obstacles),
+                          len(room.batteries), len(room.enemy_spawn_points)))
+        for door in room.doors:
+            doors.extend((DOOR_DIRECTIONS.index(door["direction"]), door["position"], *door["rect"]))
+
+    # Граф клеток в виде смещений и плоских списков соседей
+    link_offsets = [0]
+    link_targets = []
+    link_costs = []
+    for neighbors in flow_field.links:
+        for next_index, cost in neighbors:
+            link_targets.append(next_index)
+            link_costs.append(cost)
+        link_offsets.append(len(link_targets))
+
+    door_info = []
+    door_pairs = []
+    for region, next_region, pairs, entry in planner.doors:
+        door_info.extend((region, next_region, entry, len(pairs)))
+        door_pairs.extend(_points(pairs))
+    # Локальные поля хранят только клетки своей области: (клетка, расстояние) с границами по проходам
+    field_offsets = [0]
+    field_cells = []
+    field_distances = []
+    for field in planner.local_fields:
+        field_cells.extend(field.keys())
+        field_distances.extend(field.values())
+        field_offsets.append(len(field_cells))
+
+    sections = [
+        _section('q', (level.seed, level.runtime_seed, tile_map.tile_size, len(rooms), len(level.corridors),
+                       len(planner.doors), *level.exit)),
+        _section('B', tile_map.tiles),
+        _section('i', room_info),
+        _section('i', doors),
+        _section('i', _rects(obstacle for room in rooms for obstacle in room.obstacles)),
+        _section('i', _rects(battery for room in rooms for battery in room.batteries)),
+        _section('d', _points(point for room in rooms for point in room.enemy_spawn_points)),
+        _section('i', _rects(level.corridors)),
+        _section('i', _points(level.corridor_links)),
+        _section('i', _rects(level.obstacles)),
+        _section('d', _points(level.spawn_points)),
+        _section('i', _points(anchor or (-1, -1) for anchor in flow_field.anchors)),
+        _section('i', link_offsets),
+        _section('i', link_targets),
+        _section('B', link_costs),
+        _section('h', planner.regions),
+        _section('i', door_info),
+        _section('i', door_pairs),
+        _section('i', field_offsets),
+        _section('i', field_cells),
+        _section('i', field_distances)
+    ]
+
+    # Кеш необязателен: ошибки файлов (в том числе чтения исходников для ключа) не мешают созданию уровня
+    path = None
+    try:
+        path = cache_path(level.seed)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(LEVEL_CACHE_DIR, exist_ok=True)
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(HEADER.pack(MAGIC, LEVEL_CACHE_VERSION, cache_key(level.seed)))
+            for section in sections:
+                cache_file.write(section)
+        os.replace(temp_path, path)
+        _evict_old_levels()
+    except OSError as e:
+        print(f"Не удалось сохранить уровень в кеш: {path or LEVEL_CACHE_DIR}. Ошибка: {e}")
+
+
+def _evict_old_levels():
+    """Оставляет в папке кеша не больше LEVEL_CACHE_MAX_FILES последних использованных уровней"""
+    paths = [os.path.join(LEVEL_CACHE_DIR, name) for name in os.listdir(LEVEL_CACHE_DIR)
+             if name.startswith("level_") and name.endswith(".bin")]
+    if len(paths) <= LEVEL_CACHE_MAX_FILES:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - LEVEL_CACHE_MAX_FILES]:
+        os.remove(path)
+
+
+class _Reader:
+    """Последовательное чтение секций из отображенного в память файла"""
+
+    def __init__(self, buffer, offset):
+        self.buffer = buffer
+        self.offset = offset
+
+    def read(self):
+        typecode, count = SECTION.unpack_from(self.buffer, self.offset)
+        self.offset += SECTION.size
+        data = array(typecode.decode())
+        end = self.offset + count * data.itemsize
+        if end > len(self.buffer):
+            raise ValueError("секция выходит за конец файла")
+        data.frombytes(self.buffer[self.offset:end])
+        self.offset = end
+        return data
+
+
+def _read_rects(values):
+    return [pygame.Rect(values[i:i + 4]) for i in range(0, len(values), 4)]
+
+
+def _read_points(values):
+    return [(values[i], values[i + 1]) for i in range(0, len(values), 2)]
+
+
+def load_level(seed):
+    """Загружает уровень из кеша по зерну; None, если файла нет или он устарел"""
+    try:
+        path = cache_path(seed)
+        with open(path, "rb") as cache_file:
+            with mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                layout = _read_level(buffer)
+    except (OSError, ValueError, IndexError, StopIteration, struct.error):
+        return None
+    if layout is not None:
+        # Время изменения файла - время последнего использования: вытесняются давно не загружавшиеся уровни
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return layout
+
+
+def _read_level(buffer):
+    magic, version, key = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != LEVEL_CACHE_VERSION:
+        return None
+    reader = _Reader(buffer, HEADER.size)
+    seed, runtime_seed, tile_size, room_count, corridor_count, door_count, *exit_rect = reader.read()
+    if key != cache_key(seed):
+        return None
+
+    tiles = reader.read()
+    room_info = reader.read()
+    door_values = reader.read()
+    obstacles = iter(_read_rects(reader.read()))
+    batteries = iter(_read_rects(reader.read()))
+    room_spawn_points = iter(_read_points(reader.read()))
+    doors = iter(range(0, len(door_values), 6))
+
+    rooms = []
+    for i in range(0, room_count * 9, 9):
+        x, y, width, height, room_type, doors_count, obstacle_count, battery_count, spawn_count = room_info[i:i + 9]
+        room_doors = []
+        for _ in range(doors_count):
+            door = next(doors)
+            room_doors.append({"rect": pygame.Rect(door_values[door + 2:door + 6]),
+                               "direction": DOOR_DIRECTIONS[door_values[door]],
+                               "position": door_values[door + 1]})
+        rooms.append({
+            "rect": pygame.Rect(x, y, width, height),
+            "type": ROOM_TYPES[room_type],
+            "doors": room_doors,
+            "obstacles": [next(obstacles) for _ in range(obstacle_count)],
+            "batteries": [next(batteries) for _ in range(battery_count)],
+            "enemy_spawn_points": [next(room_spawn_points) for _ in range(spawn_count)]
+        })
+
+    corridors = _read_rects(reader.read())
+    corridor_links = _read_points(reader.read())
+    level_obstacles = _read_rects(reader.read())
+    spawn_points = _read_points(reader.read())
+
+    anchor_values = reader.read()
+    anchors = [None if anchor_values[i] == -1 else (anchor_values[i], anchor_values[i + 1])
+               for i in range(0, len(anchor_values), 2)]
+    link_offsets = reader.read().tolist()
+    link_pairs = list(zip(reader.read().tolist(), reader.read().tolist()))
+    links = [tuple(link_pairs[link_offsets[i]:link_offsets[i + 1]]) for i in range(len(anchors))]
+
+    regions = reader.read()
+    door_info = reader.read()
+    door_pairs = _read_points(reader.read())
+    planner_doors = []
+    pair_start = 0
+    for i in range(0, door_count * 4, 4):
+        region, next_region, entry, pair_count = door_info[i:i + 4]
+        planner_doors.append((region, next_region, door_pairs[pair_start:pair_start + pair_count], entry))
+        pair_start += pair_count
+    field_offsets = reader.read().tolist()
+    field_pairs = list(zip(reader.read().tolist(), reader.read().tolist()))
+    local_fields = [RegionDistances(field_pairs[field_offsets[i]:field_offsets[i + 1]]) for i in range(door_count)]
+
+    tile_count = len(tiles)
+    if len(corridors) != corridor_count or len(anchors) != tile_count or len(regions) != tile_count:
+        raise ValueError("несогласованные размеры секций")
+
+    return {
+        "seed": seed,
+        "runtime_seed": runtime_seed,
+        "tile_size": tile_size,
+        "tiles": tiles,
+        "rooms": rooms,
+        "corridors": corridors,
+        "corridor_links": corridor_links,
+        "obstacles": level_obstacles,
+        "spawn_points": spawn_points,
+        "exit": pygame.Rect(exit_rect),
+        "anchors": anchors,
+        "links": links,
+        "regions": regions,
+        "doors": planner_doors,
+        "local_fields": local_fields
+    }
@@ -0,0 +1,50 @@
+import random
+import threading
+from levels.level1 import Level1
+
+
+class LevelPregenerator:
+    """Заранее строит следующий уровень в фоновом потоке, пока игрок не играет (меню, пауза, конец уровня)"""
+
+    def __init__(self, sound_manager=None, seed=None):
+        self.sound_manager = sound_manager
+        # Заданное зерно (--seed): все уровни одинаковые; None - каждый раз новое
+        self.seed = seed
+        self.thread = None
+        self.level = None
+        self.error = None
+
+    @property
+    def ready(self):
+        return self.level is not None
+
+    def start(self):
+        """Начинает строить следующий уровень, если он еще не готов и не строится"""
+        if self.level is not None or (self.thread is not None and self.thread.is_alive()):
+            return
+        # Зерно выбирается в основном потоке: глобальный random не делится между потоками
+        seed = self.seed if self.seed is not None else random.randrange(1000000)
+        # Ошибка прошлой попытки больше не актуальна - уровень строится заново
+        self.error = None
+        self.thread = threading.Thread(target=self._generate, args=(seed,), daemon=True)
+        self.thread.start()
+
+    def _generate(self, seed):
+        try:
+            # Случайные зерна в кеш уровней не пишутся
+            self.level = Level1(self.sound_manager, seed, use_cache=self.seed is not None)
+        except Exception as e:
+            self.error = e
+
+    def take(self):
+        """Возвращает готовый уровень (дожидается потока или строит уровень, если его нет)"""
+        # Следующий уровень здесь не запускается: во время игры генерация отнимала бы время у кадров
+        self.start()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        level, self.level = self.level, None
+        if level is None:
+            error, self.error = self.error, None
+            raise error
+        return level
@@ -4,7 +4,9 @@ import math
 from settings import *
 
 class Room:
-    def __init__(self, x, y, width, height, room_type="normal"):
+    def __init__(self, x, y, width, height, room_type="normal", rng=None, generate=True):
+        # Собственный генератор случайных чисел (детерминированный при заданном зерне уровня)
+        self.random = rng or random.Random()
         # Убеждаемся, что комната не слишком маленькая
         min_width = 200
         min_height = 200
@@ -28,7 +30,18 @@ class Room:
         )
         
         # Генерируем внутренние препятствия в зависимости от типа комнаты
-        self._generate_obstacles()
+        if generate:
+            self._generate_obstacles()
+    
+    @classmethod
+    def restore(cls, rect, room_type, doors, obstacles, batteries, enemy_spawn_points, rng=None):
+        """Восстанавливает сохраненную комнату (из кеша уровня) без повторной генерации"""
+        room = cls(rect.x, rect.y, rect.width, rect.height, room_type, rng, generate=False)
+        room.doors = doors
+        room.obstacles = obstacles
+        room.batteries = batteries
+        room.enemy_spawn_points = enemy_spawn_points
+        return room
         
     def _create_walls(self):
         # Создаем 4 стены для комнаты
@@ -63,12 +76,12 @@ class Room:
         # Создаем случайные препятствия
         for _ in range(obstacle_count):
             # Размер препятствия
-            size = random.randint(30, 50)
+            size = self.random.randint(30, 50)
             
             # Случайная позиция внутри комнаты (с отступом от стен)
             for attempt in range(20):  # Ограничиваем количество попыток
-                x = random.randint(self.rect.x + padding, self.rect.x + self.rect.width - padding - size)
-                y = random.randint(self.rect.y + padding, self.rect.y + self.rect.height - padding - size)
+                x = self.random.randint(self.rect.x + padding, self.rect.x + self.rect.width - padding - size)
+                y = self.random.randint(self.rect.y + padding, self.rect.y + self.rect.height - padding - size)
                 
                 obstacle = pygame.Rect(x, y, size, size)
                 
@@ -93,7 +106,7 @@ class Room:
                     # Уменьшаем вероятность спавна врагов
                     if self.type != "start" and self.type != "exit":
                         spawn_chance = 0.4 if self.type == "difficult" else 0.2  # Было 0.3 для normal
-                        if random.random() < spawn_chance:
+                        if self.random.random() < spawn_chance:
                             # Увеличиваем минимальное расстояние для спавна врагов от препятствий
                             min_dist = 85  # Было 70
                             max_dist = 150  # Было 120
@@ -101,8 +114,8 @@ class Room:
                             # Создаем несколько попыток найти подходящее место для спавна
                             for spawn_attempt in range(10):
                                 # Получаем точку на определенном расстоянии от препятствия
-                                angle = random.uniform(0, 2 * 3.14159)  # Случайный угол
-                                dist = random.randint(min_dist, max_dist)  # Расстояние от препятствия
+                                angle = self.random.uniform(0, 2 * 3.14159)  # Случайный угол
+                                dist = self.random.randint(min_dist, max_dist)  # Расстояние от препятствия
                                 spawn_x = x + size/2 + math.cos(angle) * dist
                                 spawn_y = y + size/2 + math.sin(angle) * dist
                                 
@@ -157,27 +170,27 @@ class Room:
         
         if direction == "top":
             if position is None:
-                position = random.randint(self.rect.x + 100, self.rect.x + self.rect.width - 100 - door_width)
+                position = self.random.randint(self.rect.x + 100, self.rect.x + self.rect.width - 100 - door_width)
             door = pygame.Rect(position, self.rect.y, door_width, WALL_THICKNESS)
             door_info = {"rect": door, "direction": direction, "position": position}
             
         elif direction == "right":
             if position is None:
-                position = random.randint(self.rect.y + 100, self.rect.y + self.rect.height - 100 - door_width)
+                position = self.random.randint(self.rect.y + 100, self.rect.y + self.rect.height - 100 - door_width)
             door = pygame.Rect(self.rect.x + self.rect.width - WALL_THICKNESS, position, 
                              WALL_THICKNESS, door_width)
             door_info = {"rect": door, "direction": direction, "position": position}
             
         elif direction == "bottom":
             if position is None:
-                position = random.randint(self.rect.x + 100, self.rect.x + self.rect.width - 100 - door_width)
+                position = self.random.randint(self.rect.x + 100, self.rect.x + self.rect.width - 100 - door_width)
             door = pygame.Rect(position, self.rect.y + self.rect.height - WALL_THICKNESS, 
                              door_width, WALL_THICKNESS)
             door_info = {"rect": door, "direction": direction, "position": position}
             
         elif direction == "left":
             if position is None:
-                position = random.randint(self.rect.y + 100, self.rect.y + self.rect.height - 100 - door_width)
+                position = self.random.randint(self.rect.y + 100, self.rect.y + self.rect.height - 100 - door_width)
             door = pygame.Rect(self.rect.x, position, WALL_THICKNESS, door_width)
             door_info = {"rect": door, "direction": direction, "position": position}
         
@@ -197,8 +210,8 @@ class Room:
         max_attempts = 50
         
         while batteries_added < count and max_attempts > 0:
-            x = random.randint(self.rect.x + padding, self.rect.x + self.rect.width - padding - BATTERY_SIZE)
-            y = random.randint(self.rect.y + padding, self.rect.y + self.rect.height - padding - BATTERY_SIZE)
+            x = self.random.randint(self.rect.x + padding, self.rect.x + self.rect.width - padding - BATTERY_SIZE)
+            y = self.random.randint(self.rect.y + padding, self.rect.y + self.rect.height - padding - BATTERY_SIZE)
             
             battery = pygame.Rect(x, y, BATTERY_SIZE, BATTERY_SIZE)
             
@@ -0,0 +1,164 @@
+import math
+import pygame
+
+# Состояния клеток карты
+TILE_FLOOR = 0
+TILE_SOLID = 1
+TILE_OBSTACLE = 2  # Пол, частично занятый препятствием комнаты
+TILE_DOOR = 3
+
+
+class TileMap:
+    """Компактная сетка клеток уровня (один байт на клетку)"""
+
+    def __init__(self, width, height, tile_size=50, fill=TILE_FLOOR):
+        self.tile_size = tile_size
+        self.width = width
+        self.height = height
+        # Последняя клетка может выходить за край карты, как и блоки стен
+        self.cols = -(-width // tile_size)
+        self.rows = -(-height // tile_size)
+        self.tiles = bytearray([fill]) * (self.cols * self.rows)
+
+    def in_bounds(self, col, row):
+        return 0 <= col < self.cols and 0 <= row < self.rows
+
+    def get(self, col, row):
+        """Возвращает состояние клетки (за пределами карты - сплошной камень)"""
+        if not self.in_bounds(col, row):
+            return TILE_SOLID
+        return self.tiles[row * self.cols + col]
+
+    def set(self, col, row, state):
+        if self.in_bounds(col, row):
+            self.tiles[row * self.cols + col] = state
+
+    def tile_at(self, x, y):
+        """Возвращает состояние клетки, в которую попадает точка"""
+        return self.get(int(x // self.tile_size), int(y // self.tile_size))
+
+    def tile_rect(self, col, row):
+        """Прямоугольник клетки в мировых координатах"""
+        size = self.tile_size
+        return pygame.Rect(col * size, row * size, size, size)
+
+    def fill_tiles(self, col_start, row_start, col_end, row_end, state):
+        """Заполняет диапазон клеток [col_start, col_end) x [row_start, row_end) срезами строк"""
+        col_start = max(0, col_start)
+        row_start = max(0, row_start)
+        col_end = min(self.cols, col_end)
+        row_end = min(self.rows, row_end)
+        if col_start >= col_end or row_start >= row_end:
+            return
+        row_fill = bytes([state]) * (col_end - col_start)
+        for row in range(row_start, row_end):
+            offset = row * self.cols
+            self.tiles[offset + col_start:offset + col_end] = row_fill
+
+    def carve_contained(self, rect, state=TILE_FLOOR):
+        """Вырезает клетки, целиком лежащие внутри прямоугольника"""
+        size = self.tile_size
+        self.fill_tiles(-(-rect.left // size), -(-rect.top // size),
+                        rect.right // size, rect.bottom // size, state)
+
+    def carve_overlapping(self, rect, state=TILE_FLOOR):
+        """Вырезает клетки, которые перекрываются с прямоугольником"""
+        size = self.tile_size
+        self.fill_tiles(rect.left // size, rect.top // size,
+                        -(-rect.right // size), -(-rect.bottom // size), state)
+
+    def mark_overlapping(self, rect, state, only=TILE_FLOOR):
+        """Помечает клетки под прямоугольником, если они в состоянии only"""
+        size = self.tile_size
+        for row in range(max(0, rect.top // size), min(self.rows, -(-rect.bottom // size))):
+            for col in range(max(0, rect.left // size), min(self.cols, -(-rect.right // size))):
+                index = row * self.cols + col
+                if self.tiles[index] == only:
+                    self.tiles[index] = state
+
+    def traverse(self, x, y, dir_x, dir_y, max_distance):
+        """Обходит клетки вдоль единичного луча (Amanatides-Woo): (столбец, строка, состояние, вход, выход)"""
+        # При проходе точно через угол отдаются и обе клетки, которых луч касается
+        size = self.tile_size
+        col = int(x // size)
+        row = int(y // size)
+        step_col = 1 if dir_x > 0 else -1
+        step_row = 1 if dir_y > 0 else -1
+
+        # Расстояние вдоль луча до первой вертикальной/горизонтальной границы клетки
+        if dir_x != 0:
+            t_max_x = ((col + (1 if dir_x > 0 else 0)) * size - x) / dir_x
+            t_delta_x = size / abs(dir_x)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dir_y != 0:
+            t_max_y = ((row + (1 if dir_y > 0 else 0)) * size - y) / dir_y
+            t_delta_y = size / abs(dir_y)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        t = 0.0
+        while t <= max_distance:
+            t_next = min(t_max_x, t_max_y, max_distance)
+            yield col, row, self.get(col, row), t, t_next
+            if t_max_x < t_max_y:
+                col += step_col
+                t = t_max_x
+                t_max_x += t_delta_x
+            elif t_max_y < t_max_x:
+                row += step_row
+                t = t_max_y
+                t_max_y += t_delta_y
+            else:
+                # Луч проходит точно через угол: соседние по сторонам клетки тоже отдаются
+                # (с нулевой длиной), иначе луч проскочит между сплошными клетками, сходящимися углом
+                t = t_max_x
+                if t <= max_distance:
+                    yield col + step_col, row, self.get(col + step_col, row), t, t
+                    yield col, row + step_row, self.get(col, row + step_row), t, t
+                col += step_col
+                row += step_row
+                t_max_x += t_delta_x
+                t_max_y += t_delta_y
+
+    def count(self, state):
+        return self.tiles.count(state)
+
+    def solid_rects(self):
+        """Прямоугольники сплошных клеток, жадно объединенные: вправо по строке, затем вниз"""
+        size = self.tile_size
+        cols = self.cols
+        tiles = self.tiles
+        rects = []
+        used = bytearray(len(tiles))
+        for row in range(self.rows):
+            offset = row * cols
+            col = 0
+            while col < cols:
+                if tiles[offset + col] != TILE_SOLID or used[offset + col]:
+                    col += 1
+                    continue
+
+                # Расширяем прямоугольник вправо
+                end = col + 1
+                while end < cols and tiles[offset + end] == TILE_SOLID and not used[offset + end]:
+                    end += 1
+                run = bytes([TILE_SOLID]) * (end - col)
+                free = bytes(end - col)
+
+                # Расширяем вниз, пока вся полоса сплошная и еще не занята
+                bottom = row + 1
+                while bottom < self.rows:
+                    below = bottom * cols
+                    if tiles[below + col:below + end] != run or used[below + col:below + end] != free:
+                        break
+                    bottom += 1
+
+                marked = bytes([1]) * (end - col)
+                for used_row in range(row, bottom):
+                    used_offset = used_row * cols
+                    used[used_offset + col:used_offset + end] = marked
+
+                rects.append(pygame.Rect(col * size, row * size, (end - col) * size, (bottom - row) * size))
+                col = end
+        return rects
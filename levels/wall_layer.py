@@ -0,0 +1,127 @@
+from collections import OrderedDict
+import pygame
+from settings import *
+
+
+class WallLayer:
+    """Статичный слой стен уровня, отрисованный кусками по мере надобности (LRU по памяти)"""
+
+    def __init__(self, width, height, wall_grid, chunk_size=WALL_LAYER_CHUNK_SIZE,
+                 max_bytes=WALL_LAYER_CACHE_BYTES):
+        self.wall_grid = wall_grid
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.width = width
+        self.height = height
+        self.cols = -(-self.width // chunk_size)
+        self.rows = -(-self.height // chunk_size)
+
+        # (столбец, строка) -> поверхность куска, в порядке последнего использования
+        self.chunks = OrderedDict()
+        self.bytes = 0
+        # Смещение камеры на прошлом кадре - по нему определяется направление движения
+        self.last_offset = None
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+
+    def _render_chunk(self, col, row):
+        area = pygame.Rect(col * self.chunk_size, row * self.chunk_size, self.chunk_size, self.chunk_size)
+        area = area.clip(pygame.Rect(0, 0, self.width, self.height))
+        chunk = pygame.Surface(area.size).convert()
+        chunk.fill(DUNGEON_FLOOR)
+
+        # Стены в области куска
+        for wall in self.wall_grid.query_rect(area):
+            pygame.draw.rect(chunk, WALL_COLOR, wall.move(-area.x, -area.y))
+
+        # Пол прозрачный: экран заливается полом, а RLE-копирование пропускает пустые участки
+        chunk.set_colorkey(DUNGEON_FLOOR, pygame.RLEACCEL)
+        return chunk
+
+    def _add_chunk(self, key, keep):
+        """Рисует кусок и вытесняет давно не использованные, пока слой не влезет в бюджет"""
+        chunk = self._render_chunk(*key)
+        self.chunks[key] = chunk
+        self.bytes += chunk.get_pitch() * chunk.get_height()
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self.chunks))
+            if oldest in keep:
+                # Остались только нужные в этом кадре куски - бюджет меньше экрана
+                break
+            evicted = self.chunks.pop(oldest)
+            self.bytes -= evicted.get_pitch() * evicted.get_height()
+            self.evictions += 1
+        return chunk
+
+    def _get_chunk(self, key, keep):
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.hits += 1
+            self.chunks.move_to_end(key)
+            return chunk
+        self.misses += 1
+        return self._add_chunk(key, keep)
+
+    def _chunk_range(self, left, top, right, bottom):
+        """Ключи кусков, перекрывающих прямоугольник слоя [left, right) x [top, bottom)"""
+        size = self.chunk_size
+        return [(col, row)
+                for row in range(max(0, top // size), min(self.rows, (bottom - 1) // size + 1))
+                for col in range(max(0, left // size), min(self.cols, (right - 1) // size + 1))]
+
+    def _prefetch(self, offset_x, offset_y, screen, keep):
+        """Дорисовывает один кусок впереди по направлению движения камеры"""
+        if self.last_offset is None:
+            return
+        # Бюджет должен вмещать видимые куски и еще один, иначе заготовка вытеснит нужное
+        chunk_bytes = self.chunk_size * self.chunk_size * screen.get_bytesize()
+        if (len(keep) + 1) * chunk_bytes > self.max_bytes:
+            return
+        step_x = offset_x - self.last_offset[0]
+        step_y = offset_y - self.last_offset[1]
+        if not step_x and not step_y:
+            return
+        # Область просмотра, сдвинутая на полкуска вперед
+        ahead = self.chunk_size // 2
+        screen_width, screen_height = screen.get_size()
+        shift_x = (step_x > 0) - (step_x < 0)
+        shift_y = (step_y > 0) - (step_y < 0)
+        for key in self._chunk_range(offset_x + shift_x * ahead, offset_y + shift_y * ahead,
+                                     offset_x + screen_width + shift_x * ahead,
+                                     offset_y + screen_height + shift_y * ahead):
+            if key not in self.chunks:
+                self.prefetched += 1
+                self._add_chunk(key, keep)
+                return
+
+    def draw(self, screen, camera):
+        """Копирует на экран куски, попадающие в область просмотра камеры"""
+        offset_x = round(camera.offset_x)
+        offset_y = round(camera.offset_y)
+        screen_width, screen_height = screen.get_size()
+        size = self.chunk_size
+
+        visible = self._chunk_range(offset_x, offset_y, offset_x + screen_width, offset_y + screen_height)
+        keep = set(visible)
+        screen.blits([(self._get_chunk(key, keep), (key[0] * size - offset_x, key[1] * size - offset_y))
+                      for key in visible], doreturn=False)
+
+        self._prefetch(offset_x, offset_y, screen, keep)
+        self.last_offset = (offset_x, offset_y)
+
+    def stats(self):
+        """Счетчики кеша кусков для подбора размера куска и бюджета памяти"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "evictions": self.evictions,
+            "chunks": len(self.chunks),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -1,3 +1,7 @@
+import time
+# Момент запуска - до тяжелых импортов (pygame, numpy), чтобы замер запуска их учитывал
+START_TIME = time.perf_counter()
+import argparse
 import pygame
 import sys
 from scenes.menu import MainMenu
@@ -6,43 +10,77 @@ from scenes.controls import ControlsScene
 from scenes.settings_scene import SettingsScene
 from entities.player import Player
 from utils.sound_manager import SoundManager
+from levels.level_pregenerator import LevelPregenerator
+from utils.scene_registry import SceneRegistry
+from utils.startup_trace import startup_trace
+from utils.asset_manager import assets
 from settings import *
 
 
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Light Guardian")
+def main(seed=None, trace_startup=False, start_time=None):
+    if start_time is not None:
+        startup_trace.set_start(start_time)
+    with startup_trace.section("pygame.init"):
+        pygame.init()
+    with startup_trace.section("окно"):
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Light Guardian")
     clock = pygame.time.Clock()
     
     # Инициализируем звуковой менеджер
-    sound_manager = SoundManager()
+    with startup_trace.section("звуки"):
+        sound_manager = SoundManager()
     
     # Воспроизводим фоновую музыку меню
     sound_manager.play_menu_music()
     
-    # Сцены игры
-    scenes = {
-        "menu": MainMenu(sound_manager),
-        "game": GameLevel(sound_manager),
-        "controls": ControlsScene(sound_manager),
-        "settings": SettingsScene(sound_manager)
-    }
+    # Уровни строятся в фоне, пока игрок в меню (запускается после первого кадра)
+    pregenerator = LevelPregenerator(sound_manager, seed)
+    
+    # Сцены создаются при первом обращении; игровая - заново при каждом старте игры
+    scenes = SceneRegistry({
+        "menu": lambda: MainMenu(sound_manager),
+        "controls": lambda: ControlsScene(sound_manager),
+        "settings": lambda: SettingsScene(sound_manager)
+    })
     current_scene = "menu"
     previous_scene = None
     came_from_pause = False
     
+    # Логика идет фиксированными шагами, отрисовка - так часто, как получается
+    step_time = 1.0 / UPDATE_RATE
+    accumulator = 0.0
+    previous_time = time.perf_counter()
+    
     running = True
     while running:
+        current_time = time.perf_counter()
+        accumulator += current_time - previous_time
+        previous_time = current_time
+        
         events = pygame.event.get()
         for event in events:
             if event.type == pygame.QUIT:
                 running = False
         
-        # Обновление текущей сцены
+        # Обновление текущей сцены: столько шагов логики, сколько накопилось времени
         scene_result = scenes[current_scene].handle_input(events)
-        scenes[current_scene].update()
-        scenes[current_scene].draw(screen)
+        if time.perf_counter() - current_time > step_time:
+            # Ввод обрабатывался дольше шага логики (перезапуск уровня ждал его построения) -
+            # это время не игровое, и шаги логики за него не догоняются
+            accumulator = 0.0
+            previous_time = time.perf_counter()
+        update_steps = 0
+        while accumulator >= step_time and update_steps < MAX_UPDATE_STEPS:
+            scenes[current_scene].update()
+            accumulator -= step_time
+            update_steps += 1
+        if accumulator >= step_time:
+            # Слишком долгий кадр (загрузка, зависание окна) - не догоняем отставание бесконечно
+            accumulator %= step_time
+        
+        # Отрисовка промежуточного состояния между двумя последними шагами логики
+        scenes[current_scene].draw(screen, accumulator / step_time)
         
         # Обработка переключения сцен
         if scene_result:
@@ -52,8 +90,8 @@ def main():
                 # Воспроизводим звук выбора и останавливаем музыку меню при переходе в игру
                 sound_manager.play_sound("menu_select")
                 sound_manager.stop_music()
-                # При переходе в игру, создаем новый экземпляр GameLevel
-                scenes["game"] = GameLevel(sound_manager)
+                # При переходе в игру создаем новый экземпляр GameLevel с заранее построенным уровнем
+                scenes["game"] = GameLevel(sound_manager, seed=seed, pregenerator=pregenerator)
             elif scene_result == "exit":
                 running = False
             elif scene_result == "menu":
@@ -62,6 +100,8 @@ def main():
                 # Запускаем музыку меню при возврате из игры
                 if previous_scene == "game":
                     sound_manager.play_menu_music()
+                    # В меню следующий уровень строится в фоне
+                    pregenerator.start()
             elif scene_result == "controls":
                 sound_manager.play_sound("menu_select")
                 if current_scene == "game":
@@ -94,12 +134,55 @@ def main():
                     # Иначе возвращаемся в меню
                     current_scene = "menu"
         
+        # Смена сцены (например, генерация нового уровня) не должна засчитываться как игровое время
+        if scene_result:
+            accumulator = 0.0
+            previous_time = time.perf_counter()
+        
         pygame.display.flip()
+        
+        if startup_trace.recording:
+            # Первый кадр показан: остальное готовим в фоне и в свободное время кадров
+            startup_trace.frame_shown()
+            if trace_startup:
+                print(startup_trace.report())
+            # Спрайты - до фоновой генерации уровня, чтобы ни она, ни враги по ходу игры не читали файлы
+            assets.preload()
+            pregenerator.start()
+            scenes.warm("controls", "settings")
+        elif time.perf_counter() - current_time < step_time / 2:
+            # Кадр занял меньше половины бюджета - прогреваем одну сцену из очереди
+            scenes.warm_next()
+        
         clock.tick(FPS)
     
     pygame.quit()
     sys.exit()
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Light Guardian")
+    parser.add_argument("--headless", action="store_true",
+                        help="прогон логики уровня без окна и звука (для замеров и нагрузочных тестов)")
+    parser.add_argument("--frames", type=int, default=3600, help="число обновлений логики в прогоне без окна")
+    parser.add_argument("--input", choices=("random", "scripted"), default="random",
+                        help="источник ввода игрока в прогоне без окна")
+    parser.add_argument("--script", help="JSON-сценарий ввода для --input scripted")
+    parser.add_argument("--draw", action="store_true", help="отрисовывать кадры во внеэкранную поверхность")
+    parser.add_argument("--seed", type=int, help="зерно генерации уровня (одинаковое зерно - одинаковая карта)")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="вывести время до первого кадра с разбивкой по сценам и ресурсам")
+    args = parser.parse_args()
+    if args.input == "scripted" and not args.script:
+        parser.error("--input scripted требует --script")
+    return args
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.headless:
+        # Импорт выставляет драйверы SDL-заглушки, поэтому только в этом режиме
+        from utils.headless import run_headless
+        run_headless(args.frames, args.input, args.script, args.draw, args.seed)
+    else:
+        main(args.seed, args.startup_trace, START_TIME)
\ No newline at end of file
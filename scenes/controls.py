@@ -1,39 +1,21 @@
 import pygame
-import os
-import random
 from settings import *
+from utils.noise_background import dark_background
+from utils.text_cache import text_cache, TITLE_FONT, TEXT_FONT
 
 class ControlsScene:
     def __init__(self, sound_manager=None):
         # Добавляем звуковой менеджер
         self.sound_manager = sound_manager
         
-        # Загрузка шрифтов
-        font_path = os.path.join('assets', 'fonts', 'Nosifer', 'Nosifer-Regular.ttf')
-        if os.path.exists(font_path):
-            self.font_title = pygame.font.Font(font_path, 48)
-        else:
-            self.font_title = pygame.font.SysFont('Arial', 48)
-            
-        elite_path = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
-        if os.path.exists(elite_path):
-            self.font_text = pygame.font.Font(elite_path, 24)
-            self.font_subtitle = pygame.font.Font(elite_path, 32)
-        else:
-            self.font_text = pygame.font.SysFont('Arial', 24)
-            self.font_subtitle = pygame.font.SysFont('Arial', 32)
+        # Шрифты (путь, размер) - надписи рисуются через общий кеш текста
+        self.font_title = (TITLE_FONT, 48)
+        self.font_text = (TEXT_FONT, 24)
+        self.font_subtitle = (TEXT_FONT, 32)
         
         # Фон
-        self.background = self._create_dark_background()
+        self.background = dark_background()
 
-    def _create_dark_background(self):
-        bg = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        for y in range(0, SCREEN_HEIGHT, 4):
-            for x in range(0, SCREEN_WIDTH, 4):
-                darkness = random.randint(0, 20)
-                color = (darkness, darkness, darkness)
-                pygame.draw.rect(bg, color, (x, y, 4, 4))
-        return bg
         
     def handle_input(self, events):
         for event in events:
@@ -48,7 +30,7 @@ class ControlsScene:
     def update(self):
         pass
         
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # Отображаем фон
         screen.blit(self.background, (0, 0))
         
@@ -56,7 +38,7 @@ class ControlsScene:
         self._draw_vignette(screen)
         
         # Заголовок
-        title = self.font_title.render("CONTROLS", True, (255, 191, 0))
+        title = text_cache.render(*self.font_title, "CONTROLS", (255, 191, 0))
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 50))
         
         # Информация об управлении
@@ -96,20 +78,20 @@ class ControlsScene:
         y_pos = y_start
         for section in controls:
             # Отображаем заголовок раздела
-            subtitle = self.font_subtitle.render(section["title"], True, (200, 200, 200))
+            subtitle = text_cache.render(*self.font_subtitle, section["title"], (200, 200, 200))
             screen.blit(subtitle, (SCREEN_WIDTH//2 - subtitle.get_width()//2, y_pos))
             y_pos += 50
             
             # Отображаем управление в этом разделе
             for key_info in section["keys"]:
-                text = self.font_text.render(key_info, True, (180, 180, 180))
+                text = text_cache.render(*self.font_text, key_info, (180, 180, 180))
                 screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, y_pos))
                 y_pos += 30
             
             y_pos += 20
         
         # Инструкция для возврата - размещаем её с гарантированным отступом от последнего элемента
-        back_text = self.font_text.render("Press ESC to return", True, (150, 150, 150))
+        back_text = text_cache.render(*self.font_text, "Press ESC to return", (150, 150, 150))
         screen.blit(back_text, (SCREEN_WIDTH//2 - back_text.get_width()//2, SCREEN_HEIGHT - 30))
     
     def _draw_vignette(self, screen):
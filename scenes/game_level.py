@@ -1,35 +1,45 @@
 import pygame
-import os
-import math
 from settings import *
 from entities.player import Player
 from entities.camera import Camera
 from levels.level1 import Level1
+from utils.text_cache import text_cache, TITLE_FONT, TEXT_FONT
 
 
 class GameLevel:
-    def __init__(self, sound_manager=None):
+    def __init__(self, sound_manager=None, input_source=None, seed=None, pregenerator=None):
         self.sound_manager = sound_manager
-        self.level = Level1(sound_manager)
+        self.input_source = input_source
+        # Зерно, заданное при запуске (None - каждый раз новая карта)
+        self.requested_seed = seed
+        # Уровень, заранее построенный в фоне, или генерация на месте
+        self.pregenerator = pregenerator
+        if pregenerator is not None:
+            self.level = pregenerator.take()
+        else:
+            self.level = Level1(sound_manager, seed)
         # Создаем игрока в стартовой позиции уровня
         start_x, start_y = self.level.start_position
-        self.player = Player(start_x, start_y, sound_manager)
+        self.player = Player(start_x, start_y, sound_manager, input_source)
         self.camera = Camera()
         self.camera.set_target(self.player)
         
-        # Загружаем шрифты
-        elite_path = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
-        if os.path.exists(elite_path):
-            self.font = pygame.font.Font(elite_path, 24)
-        else:
-            self.font = pygame.font.SysFont('Arial', 24)
-            
         self.game_state = "playing"  # playing, game_over, level_complete, paused
         self.message_timer = 0
         self.fullscreen = FULLSCREEN
         
         # Поверхность для создания маски темноты
-        self.darkness_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.darkness_surface = pygame.Surface((self.camera.view_width, self.camera.view_height), pygame.SRCALPHA)
+        self.darkness_surface.fill((0, 0, 0, 180))
+        self.darkness_holes = []  # Просветы в маске, вырезанные на прошлом кадре
+        
+        # Затемнение под сообщениями и меню паузы и подложки свечения заголовков (по размеру)
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 150))
+        self.glow_surfaces = {}
+        
+        # Последний кадр мира с затемнением - вне игры он не меняется и только копируется
+        self.frozen_frame = None
         
         # Эффект темноты включен
         self.darkness_enabled = True
@@ -49,6 +59,7 @@ class GameLevel:
                 if event.key == pygame.K_ESCAPE:
                     if self.game_state == "playing":
                         self.game_state = "paused"
+                        self._pregenerate_next()
                         # Звук при вызове паузы
                         if self.sound_manager:
                             self.sound_manager.play_sound("menu_select")
@@ -62,17 +73,22 @@ class GameLevel:
                     elif self.game_state == "game_over":
                         return "menu"
                 elif event.key == pygame.K_r and self.game_state == "game_over":
-                    self.__init__(self.sound_manager)  # Перезапуск уровня
+                    self.__init__(self.sound_manager, self.input_source, self.requested_seed,
+                                  self.pregenerator)  # Перезапуск уровня
                 elif event.key == pygame.K_SPACE and self.game_state == "level_complete":
                     return "menu"  # Возвращаемся в меню
                 elif event.key == pygame.K_f:  # Переключение полноэкранного режима
                     self._toggle_fullscreen()
+                    self.frozen_frame = None
                 elif event.key == pygame.K_l:  # Переключение эффекта темноты (для отладки)
                     self.darkness_enabled = not self.darkness_enabled
+                    self.frozen_frame = None
                 elif event.key == pygame.K_EQUALS or event.key == pygame.K_KP_PLUS:  # Приблизить камеру
                     self.camera.adjust_zoom(0.1)
+                    self.frozen_frame = None
                 elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:  # Отдалить камеру
                     self.camera.adjust_zoom(-0.1)
+                    self.frozen_frame = None
                     
                 # Обработка управления в меню паузы
                 if self.game_state == "paused":
@@ -94,12 +110,13 @@ class GameLevel:
                         elif self.selected_pause_option == 2:  # Quit to Menu
                             return "menu"
         
-        if self.game_state == "playing":
-            self.player.handle_input(events, self.level, self.camera)
         return None
 
     def update(self):
         if self.game_state == "playing":
+            # Движение игрока по зажатым клавишам - на каждом шаге логики
+            self.player.update(self.level, self.camera)
+            
             # Обновление камеры с учетом размеров карты
             self.camera.update(self.level.width, self.level.height)
             level_result = self.level.update(self.player)
@@ -107,9 +124,11 @@ class GameLevel:
             if level_result == "game_over":
                 self.game_state = "game_over"
                 self.message_timer = 180  # 3 секунды
+                self._pregenerate_next()
             elif level_result == "level_complete":
                 self.game_state = "level_complete"
                 self.message_timer = 180
+                self._pregenerate_next()
         elif self.game_state == "paused":
             # Обновление пульсации выбранного пункта меню
             self.pulse_value += 0.05 * self.pulse_direction
@@ -123,96 +142,112 @@ class GameLevel:
             if self.message_timer > 0:
                 self.message_timer -= 1
 
-    def draw(self, screen):
-        screen.fill(BLACK)
+    def _pregenerate_next(self):
+        """Игра остановлена - следующий уровень строится в фоне, не мешая кадрам игры"""
+        if self.pregenerator is not None:
+            self.pregenerator.start()
+
+    def draw(self, screen, alpha=1.0):
+        if self.game_state == "playing":
+            self.frozen_frame = None
+            self._draw_world(screen, alpha)
+            return
+        
+        # Вне игры мир стоит на месте: он рисуется один раз вместе с затемнением
+        # и неподвижными надписями, дальше кадр только копируется
+        if self.frozen_frame is None or self.frozen_frame.get_size() != screen.get_size():
+            self._draw_world(screen, 1.0)
+            if self.game_state == "game_over":
+                self.draw_message(screen, "GAME OVER", "Press R to restart or ESC to quit")
+            elif self.game_state == "level_complete":
+                self.draw_message(screen, "LEVEL COMPLETE!", "Press SPACE to continue")
+            elif self.game_state == "paused":
+                self._draw_pause_menu(screen)
+            self.frozen_frame = screen.copy()
+        else:
+            screen.blit(self.frozen_frame, (0, 0))
+        
+        # Пульсирующие пункты меню паузы рисуются поверх каждый кадр
+        if self.game_state == "paused":
+            self._draw_pause_options(screen)
+    
+    def _draw_world(self, screen, alpha):
+        # alpha - доля шага логики, прошедшая после последнего обновления;
+        # вне игры состояние не меняется, и сглаживать нечего
+        self.camera.interpolate(alpha)
         
-        # Отрисовка уровня и игрока с учетом камеры
-        self.level.draw(screen, self.camera)
-        self.player.draw(screen, self.camera, self.level)
+        # Мир рисуется в масштабе 1:1 на поверхность области просмотра камеры
+        view = self.camera.view_surface(screen)
+        self.level.draw(view, self.camera)
+        self.player.draw(view, self.camera, self.level)
 
         # Если эффект темноты включен, применяем его
         if self.darkness_enabled:
-            self._apply_darkness_effect(screen)
+            self._apply_darkness_effect(view)
+        
+        # Масштаб камеры - одно растягивание области просмотра на экран
+        self.camera.present(screen)
         
         # Обновленный HUD для отображения заряда батареи
         self._draw_battery_indicator(screen)
-        
-        # Отрисовка сообщений о состоянии игры
-        if self.game_state == "game_over":
-            self.draw_message(screen, "GAME OVER", "Press R to restart or ESC to quit")
-        elif self.game_state == "level_complete":
-            self.draw_message(screen, "LEVEL COMPLETE!", "Press SPACE to continue")
-        elif self.game_state == "paused":
-            self._draw_pause_menu(screen)
     
     def _apply_darkness_effect(self, screen):
         """Применяет эффект темноты, оставляя видимыми только области вокруг игрока и фонарика"""
-        self.darkness_surface.fill((0, 0, 0, 180))
+        # Маска по размеру области просмотра (меняется вместе с масштабом камеры);
+        # заливаются заново только просветы прошлого кадра
+        if self.darkness_surface.get_size() != screen.get_size():
+            self.darkness_surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            self.darkness_surface.fill((0, 0, 0, 180))
+        else:
+            for hole in self.darkness_holes:
+                self.darkness_surface.fill((0, 0, 0, 180), hole)
+        self.darkness_holes = []
         
         # Получаем позицию игрока на экране
-        player_screen_pos = self.camera.apply(self.player.rect)
+        player_screen_pos = self.camera.apply_moving(self.player.rect, self.player.previous_position)
         player_screen_x, player_screen_y = player_screen_pos.centerx, player_screen_pos.centery
         
         # Создаем видимую область вокруг игрока (базовое освещение)
-        # Учитываем масштаб камеры для корректного размера света
-        base_light_radius = 110 * self.camera.zoom
-        pygame.draw.circle(self.darkness_surface, (0, 0, 0, 0), 
-                          (player_screen_x, player_screen_y), base_light_radius)
-        
-        # Если фонарик включен, добавляем его свет
-        if self.player.flashlight.on and self.player.flashlight.battery > 0:
-            angle_rad = math.radians(LIGHT_ANGLE)
-            # Учитываем масштаб камеры для радиуса света фонарика
-            distance = LIGHT_RADIUS * (self.player.flashlight.battery / 100) * self.camera.zoom
-            
-            # Создаем конус света
-            flash_points = [(player_screen_x, player_screen_y)]
-            num_rays = 15
-            
-            # Угол фонарика (направление мыши)
-            light_angle = self.player.flashlight.angle
-            
-            # Собираем точки для полигона конуса света
-            for i in range(num_rays + 1):
-                ray_angle = light_angle - angle_rad/2 + (angle_rad * i / num_rays)
-                end_x = player_screen_x + math.cos(ray_angle) * distance
-                end_y = player_screen_y + math.sin(ray_angle) * distance
-                flash_points.append((end_x, end_y))
-            
-            # Рисуем полигон света с нулевой прозрачностью
-            if len(flash_points) > 2:
-                pygame.draw.polygon(self.darkness_surface, (0, 0, 0, 0), flash_points)
+        base_light_radius = 110
+        self.darkness_holes.append(pygame.draw.circle(self.darkness_surface, (0, 0, 0, 0), 
+                                                      (player_screen_x, player_screen_y), base_light_radius))
+        
+        # Если фонарик включен, вырезаем из темноты тот же полигон, что освещает фонарик
+        light_polygon = self.player.flashlight.light_polygon
+        if len(light_polygon) > 2:
+            flash_points = [self.camera.apply_point(x, y) for x, y in light_polygon]
+            self.darkness_holes.append(pygame.draw.polygon(self.darkness_surface, (0, 0, 0, 0), flash_points))
         
         # Накладываем темную маску на игровой экран
         screen.blit(self.darkness_surface, (0, 0))
             
     def draw_message(self, screen, title, subtitle):
         # Затемнение экрана
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        screen.blit(overlay, (0, 0))
-        
-        # Загружаем шрифты для заголовка
-        nosifer_path = os.path.join('assets', 'fonts', 'Nosifer', 'Nosifer-Regular.ttf')
-        if os.path.exists(nosifer_path):
-            title_font = pygame.font.Font(nosifer_path, 64)
-        else:
-            title_font = pygame.font.SysFont('Arial', 64)
+        screen.blit(self.overlay, (0, 0))
         
         # Отрисовка заголовка
-        title_text = title_font.render(title, True, (255, 191, 0))
+        title_text = text_cache.render(TITLE_FONT, 64, title, (255, 191, 0))
         
-        # Создаем эффект свечения вокруг текста
-        glow_surface = pygame.Surface((title_text.get_width() + 20, title_text.get_height() + 20), pygame.SRCALPHA)
-        pygame.draw.rect(glow_surface, (255, 191, 0, 50), (0, 0, title_text.get_width() + 20, title_text.get_height() + 20), border_radius=30)
+        # Эффект свечения вокруг текста
+        glow_surface = self._glow_surface(title_text)
         screen.blit(glow_surface, (SCREEN_WIDTH//2 - (title_text.get_width() + 20)//2, SCREEN_HEIGHT//2 - 60))
         
         screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
         
         # Отрисовка подзаголовка
-        subtitle_text = self.font.render(subtitle, True, WHITE)
+        subtitle_text = text_cache.render(TEXT_FONT, 24, subtitle, WHITE)
         screen.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, SCREEN_HEIGHT//2 + 20))
     
+    def _glow_surface(self, title_text):
+        """Подложка свечения под заголовок (создается один раз на размер)"""
+        size = (title_text.get_width() + 20, title_text.get_height() + 20)
+        glow_surface = self.glow_surfaces.get(size)
+        if glow_surface is None:
+            glow_surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(glow_surface, (255, 191, 0, 50), (0, 0, *size), border_radius=30)
+            self.glow_surfaces[size] = glow_surface
+        return glow_surface
+    
     def _toggle_fullscreen(self):
         global FULLSCREEN
         FULLSCREEN = not FULLSCREEN
@@ -256,10 +291,9 @@ class GameLevel:
                             (x_pos + border, y_pos + border, 
                              charge_width, bar_height - 2 * border))
         
-        # Отображаем текст с процентом заряда
-        battery_text = self.font.render(f"{int(self.player.flashlight.battery)}%", 
-                                       True, WHITE)
-        screen.blit(battery_text, (x_pos + bar_width + 15, y_pos - 2))
+        # Отображаем текст с процентом заряда (из готовых глифов цифр)
+        text_cache.draw_number(screen, TEXT_FONT, 24, int(self.player.flashlight.battery), WHITE,
+                               (x_pos + bar_width + 15, y_pos - 2), suffix="%")
         
         # Значок фонарика
         flashlight_icon_x = x_pos - 30
@@ -271,35 +305,29 @@ class GameLevel:
                         (flashlight_icon_x, y_pos + 3, 15, 14))
 
     def _draw_pause_menu(self, screen):
+        # Неподвижная часть меню паузы (пункты меню - в _draw_pause_options)
         # Затемнение экрана
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        screen.blit(overlay, (0, 0))
-        
-        # Загружаем шрифты для заголовка
-        nosifer_path = os.path.join('assets', 'fonts', 'Nosifer', 'Nosifer-Regular.ttf')
-        if os.path.exists(nosifer_path):
-            title_font = pygame.font.Font(nosifer_path, 54)
-        else:
-            title_font = pygame.font.SysFont('Arial', 54)
+        screen.blit(self.overlay, (0, 0))
         
         # Отрисовка заголовка
-        title_text = title_font.render("PAUSED", True, (255, 191, 0))
+        title_text = text_cache.render(TITLE_FONT, 54, "PAUSED", (255, 191, 0))
         
-        # Создаем эффект свечения вокруг текста
-        glow_surface = pygame.Surface((title_text.get_width() + 20, title_text.get_height() + 20), pygame.SRCALPHA)
-        pygame.draw.rect(glow_surface, (255, 191, 0, 50), (0, 0, title_text.get_width() + 20, title_text.get_height() + 20), border_radius=30)
+        # Эффект свечения вокруг текста
+        glow_surface = self._glow_surface(title_text)
         screen.blit(glow_surface, (SCREEN_WIDTH//2 - (title_text.get_width() + 20)//2, SCREEN_HEIGHT//2 - 160))
         
         screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, SCREEN_HEIGHT//2 - 150))
         
+        # Добавляем подсказку внизу экрана
+        hint = text_cache.render(None, 18, "Use UP/DOWN to navigate, ENTER to select, ESC to resume", (150, 150, 150))
+        screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, SCREEN_HEIGHT - 40))
+        
+        # Зерно уровня - чтобы карту можно было воспроизвести (python main.py --seed N)
+        seed_text = text_cache.render(None, 18, f"Seed: {self.level.seed}", (150, 150, 150))
+        screen.blit(seed_text, (SCREEN_WIDTH//2 - seed_text.get_width()//2, SCREEN_HEIGHT - 70))
+
+    def _draw_pause_options(self, screen):
         # Отображаем пункты меню
-        elite_path = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
-        if os.path.exists(elite_path):
-            menu_font = pygame.font.Font(elite_path, 32)
-        else:
-            menu_font = pygame.font.SysFont('Arial', 32)
-            
         for i, option in enumerate(self.pause_options):
             if i == self.selected_pause_option:
                 # Анимированное свечение для выбранного пункта
@@ -308,10 +336,5 @@ class GameLevel:
             else:
                 color = (200, 200, 200)
                 
-            text = menu_font.render(option, True, color)
-            screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT//2 - 50 + i*60))
-        
-        # Добавляем подсказку внизу экрана
-        hint_font = pygame.font.SysFont('Arial', 18)
-        hint = hint_font.render("Use UP/DOWN to navigate, ENTER to select, ESC to resume", True, (150, 150, 150))
-        screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, SCREEN_HEIGHT - 40))
\ No newline at end of file
+            text = text_cache.render(TEXT_FONT, 32, option, color)
+            screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT//2 - 50 + i*60))
\ No newline at end of file
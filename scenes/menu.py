@@ -1,7 +1,8 @@
 import pygame
-import os
-import random
 from settings import *
+from utils.noise_background import dark_background
+from utils.text_cache import text_cache, TITLE_FONT, TEXT_FONT
+from utils.startup_trace import startup_trace
 
 
 class MainMenu:
@@ -9,18 +10,13 @@ class MainMenu:
         # Добавляем звуковой менеджер
         self.sound_manager = sound_manager
         
-        # Загрузка шрифтов
-        font_path = os.path.join('assets', 'fonts', 'Nosifer', 'Nosifer-Regular.ttf')
-        if os.path.exists(font_path):
-            self.font_title = pygame.font.Font(font_path, 64)
-        else:
-            self.font_title = pygame.font.SysFont('Arial', 64)
-            
-        elite_path = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
-        if os.path.exists(elite_path):
-            self.font_menu = pygame.font.Font(elite_path, 32)
-        else:
-            self.font_menu = pygame.font.SysFont('Arial', 32)
+        # Шрифты (путь, размер) - надписи рисуются через общий кеш текста
+        self.font_title = (TITLE_FONT, 64)
+        self.font_menu = (TEXT_FONT, 32)
+        self.font_hint = (TEXT_FONT, 16)
+        with startup_trace.section("шрифты"):
+            for font in (self.font_title, self.font_menu, self.font_hint):
+                text_cache.font(*font)
             
         self.selected = 0
         # Добавляем пункт "Controls" в меню
@@ -31,21 +27,12 @@ class MainMenu:
         self.pulse_direction = 1
         
         # Создаем фоновую текстуру
-        self.background = self._create_dark_background()
+        with startup_trace.section("фон"):
+            self.background = dark_background()
         
         # Флаг полноэкранного режима
         self.fullscreen = FULLSCREEN
         
-    def _create_dark_background(self):
-        # Создаем текстуру тёмного фона с небольшими вариациями
-        bg = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        for y in range(0, SCREEN_HEIGHT, 4):
-            for x in range(0, SCREEN_WIDTH, 4):
-                darkness = random.randint(0, 20)  # Небольшие вариации темноты
-                color = (darkness, darkness, darkness)
-                pygame.draw.rect(bg, color, (x, y, 4, 4))
-                
-        return bg
     
     def handle_input(self, events):
         for event in events:
@@ -87,7 +74,7 @@ class MainMenu:
             self.pulse_value = 0.3
             self.pulse_direction = 1
     
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # Отображаем текстурированный фон
         screen.blit(self.background, (0, 0))
         
@@ -95,7 +82,7 @@ class MainMenu:
         self._draw_vignette(screen)
         
         # Отображаем заголовок с эффектом свечения
-        title = self.font_title.render("LIGHT GUARDIAN", True, (255, 191, 0))
+        title = text_cache.render(*self.font_title, "LIGHT GUARDIAN", (255, 191, 0))
         
         # Создаем эффект свечения
         glow_surface = pygame.Surface((title.get_width() + 20, title.get_height() + 20), pygame.SRCALPHA)
@@ -113,17 +100,11 @@ class MainMenu:
             else:
                 color = (200, 200, 200)
                 
-            text = self.font_menu.render(option, True, color)
+            text = text_cache.render(*self.font_menu, option, color)
             screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 300 + i*60))
             
         # Добавляем подсказку внизу экрана с информацией о полноэкранном режиме
-        elite_path = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
-        if os.path.exists(elite_path):
-            hint_font = pygame.font.Font(elite_path, 16)
-        else:
-            hint_font = pygame.font.SysFont('Arial', 16)
-        
-        hint = hint_font.render("Use UP/DOWN to navigate, ENTER to select, F for fullscreen", True, (180, 180, 180))
+        hint = text_cache.render(*self.font_hint, "Use UP/DOWN to navigate, ENTER to select, F for fullscreen", (180, 180, 180))
         screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, SCREEN_HEIGHT - 40))
             
     def _draw_vignette(self, screen):
@@ -1,30 +1,20 @@
 import pygame
-import os
-import random
 from settings import *
+from utils.noise_background import dark_background
+from utils.text_cache import text_cache, TITLE_FONT, TEXT_FONT
 
 class SettingsScene:
     def __init__(self, sound_manager=None):
         # Звуковой менеджер
         self.sound_manager = sound_manager
         
-        # Загрузка шрифтов
-        font_path = os.path.join('assets', 'fonts', 'Nosifer', 'Nosifer-Regular.ttf')
-        if os.path.exists(font_path):
-            self.font_title = pygame.font.Font(font_path, 48)
-        else:
-            self.font_title = pygame.font.SysFont('Arial', 48)
-            
-        elite_path = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
-        if os.path.exists(elite_path):
-            self.font_text = pygame.font.Font(elite_path, 24)
-            self.font_subtitle = pygame.font.Font(elite_path, 32)
-        else:
-            self.font_text = pygame.font.SysFont('Arial', 24)
-            self.font_subtitle = pygame.font.SysFont('Arial', 32)
+        # Шрифты (путь, размер) - надписи рисуются через общий кеш текста
+        self.font_title = (TITLE_FONT, 48)
+        self.font_text = (TEXT_FONT, 24)
+        self.font_subtitle = (TEXT_FONT, 32)
         
         # Фон
-        self.background = self._create_dark_background()
+        self.background = dark_background()
         
         # Настройки громкости
         self.settings_options = [
@@ -38,14 +28,6 @@ class SettingsScene:
         self.pulse_value = 0.5
         self.pulse_direction = 1
 
-    def _create_dark_background(self):
-        bg = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        for y in range(0, SCREEN_HEIGHT, 4):
-            for x in range(0, SCREEN_WIDTH, 4):
-                darkness = random.randint(0, 20)
-                color = (darkness, darkness, darkness)
-                pygame.draw.rect(bg, color, (x, y, 4, 4))
-        return bg
         
     def handle_input(self, events):
         for event in events:
@@ -107,7 +89,7 @@ class SettingsScene:
             self.pulse_value = 0.3
             self.pulse_direction = 1
         
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # Отображаем фон
         screen.blit(self.background, (0, 0))
         
@@ -115,7 +97,7 @@ class SettingsScene:
         self._draw_vignette(screen)
         
         # Заголовок
-        title = self.font_title.render("SETTINGS", True, (255, 191, 0))
+        title = text_cache.render(*self.font_title, "SETTINGS", (255, 191, 0))
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 50))
         
         # Отображаем настройки
@@ -131,7 +113,7 @@ class SettingsScene:
                 value_color = (180, 180, 180)
             
             # Отображаем название настройки
-            name_text = self.font_subtitle.render(option["name"], True, name_color)
+            name_text = text_cache.render(*self.font_subtitle, option["name"], name_color)
             screen.blit(name_text, (SCREEN_WIDTH//4, y_pos))
             
             # Отображаем ползунок громкости
@@ -149,19 +131,20 @@ class SettingsScene:
             pygame.draw.rect(screen, value_color, 
                              (slider_x, slider_y, fill_width, slider_height))
             
-            # Отображаем текущее значение
-            value_text = self.font_text.render(f"{int(option['value'])}%", True, value_color)
-            screen.blit(value_text, 
-                       (slider_x + slider_width + 20, slider_y - value_text.get_height()//2 + slider_height//2))
+            # Отображаем текущее значение (из готовых глифов цифр)
+            value_height = text_cache.font(*self.font_text).get_height()
+            text_cache.draw_number(screen, *self.font_text, int(option['value']), value_color,
+                                   (slider_x + slider_width + 20, slider_y - value_height//2 + slider_height//2),
+                                   suffix="%")
             
             y_pos += 100
         
         # Инструкция для управления
-        help_text = self.font_text.render("Use LEFT/RIGHT to adjust, UP/DOWN to navigate", True, (150, 150, 150))
+        help_text = text_cache.render(*self.font_text, "Use LEFT/RIGHT to adjust, UP/DOWN to navigate", (150, 150, 150))
         screen.blit(help_text, (SCREEN_WIDTH//2 - help_text.get_width()//2, SCREEN_HEIGHT - 80))
         
         # Инструкция для возврата
-        back_text = self.font_text.render("Press ESC to save and return", True, (150, 150, 150))
+        back_text = text_cache.render(*self.font_text, "Press ESC to save and return", (150, 150, 150))
         screen.blit(back_text, (SCREEN_WIDTH//2 - back_text.get_width()//2, SCREEN_HEIGHT - 40))
     
     def _draw_vignette(self, screen):
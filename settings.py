@@ -2,6 +2,8 @@
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
+UPDATE_RATE = 60  # Частота шагов игровой логики (в секунду), не зависит от частоты отрисовки
+MAX_UPDATE_STEPS = 5  # Сколько шагов логики можно догнать за один кадр отрисовки
 FULLSCREEN = False  # Флаг для полноэкранного режима
 
 # Цвета
@@ -27,6 +29,7 @@ WALL_THICKNESS = 20  # Толщина внешних стен
 ENEMY_SIZE = 35
 ENEMY_DETECTION_RADIUS = 250
 ENEMY_CHASE_LIMIT = 350
+ENEMY_PATH_FIELD_RADIUS = 700  # Радиус общего поля путей вокруг игрока (дальше - граф комнат)
 
 # Теневой враг (исчезает на свету)
 SHADOW_ENEMY_SPEED = 2.5
@@ -44,6 +47,16 @@ GHOST_ENEMY_STUN_TIME = 180  # 3 секунды при 60 FPS
 # Карта
 MAP_WIDTH = 2560  # Увеличенный размер карты (в 2 раза шире экрана)
 MAP_HEIGHT = 1440  # Увеличенный размер карты (в 2 раза выше экрана)
+LEVEL_CACHE_ENABLED = True  # Сохранять уровни с заданным зерном (--seed) на диск и загружать их по зерну
+LEVEL_CACHE_DIR = "level_cache"  # Папка кеша уровней
+LEVEL_CACHE_MAX_FILES = 32  # Сколько уровней хранится в кеше (давно не использованные удаляются)
+BACKGROUND_CACHE_ENABLED = False  # Сохранять шум фона меню в файл (по разрешению)
+BACKGROUND_CACHE_DIR = LEVEL_CACHE_DIR  # Папка для файлов шума фона
+WALL_LAYER_CHUNK_SIZE = 512  # Размер куска заранее отрисованного слоя стен (в пикселях мира)
+WALL_LAYER_CACHE_BYTES = 24 * 1024 * 1024  # Память под отрисованные куски слоя стен
+
+# Интерфейс
+TEXT_CACHE_SIZE = 256  # Сколько отрисованных надписей хранится в кеше текста
 
 # Игровые объекты
 BATTERY_SIZE = 20
@@ -0,0 +1,50 @@
+import threading
+import pygame
+from settings import *
+from utils.startup_trace import startup_trace
+
+# Спрайты игры: имя -> (путь к файлу, размер стороны после масштабирования)
+SPRITE_MANIFEST = {
+    "player": ("assets/sprites/player/tile_0097.png", int(PLAYER_SIZE * 2.2)),
+    "shadow_enemy": ("assets/sprites/enemy/tile_0121.png", int(ENEMY_SIZE * 1.8)),
+    "ghost_enemy": ("assets/sprites/enemy/tile_0108.png", int(ENEMY_SIZE * 1.8)),
+    "battery": ("assets/sprites/items/battery.png", int(BATTERY_SIZE * 1.5)),
+    "portal1": ("assets/sprites/items/portalRings1.png", EXIT_SIZE * 2),
+    "portal2": ("assets/sprites/items/portalRings2.png", EXIT_SIZE * 2)
+}
+
+
+class AssetManager:
+    """Спрайты игры по манифесту: каждый загружается и масштабируется один раз (поверхности общие)"""
+
+    def __init__(self, manifest=SPRITE_MANIFEST):
+        self.manifest = manifest
+        self.sprites = {}
+        # Уровни строятся и в фоновом потоке - загрузка одного спрайта не должна идти дважды
+        self.lock = threading.Lock()
+        self.loads = 0
+
+    def sprite(self, name):
+        """Спрайт из манифеста (загружается при первом обращении)"""
+        sprite = self.sprites.get(name)
+        if sprite is None:
+            with self.lock:
+                sprite = self.sprites.get(name)
+                if sprite is None:
+                    path, size = self.manifest[name]
+                    sprite = pygame.image.load(path).convert_alpha()
+                    sprite = pygame.transform.scale(sprite, (size, size))
+                    self.sprites[name] = sprite
+                    self.loads += 1
+        return sprite
+
+    def preload(self, names=None):
+        """Загружает спрайты (по умолчанию весь манифест), например на экране загрузки"""
+        for name in names or self.manifest:
+            if name not in self.sprites:
+                with startup_trace.section(f"спрайт {name}"):
+                    self.sprite(name)
+
+
+# Общие спрайты для всех сцен и объектов
+assets = AssetManager()
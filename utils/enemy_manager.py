@@ -1,14 +1,17 @@
 import pygame
 import random
 import math
+import numpy as np
 from settings import *
 from entities.enemy import ShadowEnemy, GhostEnemy
 
 class EnemyManager:
     """Класс для управления врагами: создание, удаление, обновление с учетом комнатной структуры уровня"""
     
-    def __init__(self, level=None, sound_manager=None):
+    def __init__(self, level=None, sound_manager=None, seed=None):
         self.level = level
+        # Свой генератор для спавна, чтобы последовательность врагов повторялась при том же зерне
+        self.random = random.Random(seed)
         self.enemies = []
         self.sound_manager = sound_manager
         self.shadow_spawn_timer = 0
@@ -27,6 +30,7 @@ class EnemyManager:
         self.spawn_points = []
         
         # Комнатный контекст - отслеживаем, в какой комнате находится игрок
+        self.current_region = None  # Область (комната или коридор), где находится игрок
         self.current_room = None
         self.near_rooms = []  # Комнаты, соединенные с текущей
         
@@ -47,6 +51,9 @@ class EnemyManager:
         
         # Обрабатываем таймер столкновения если игрок уже был атакован
         if self.player_hit:
+            # Враги стоят - отрисовка не должна сдвигать их от прошлого положения
+            for enemy in self.enemies:
+                enemy.previous_position = enemy.rect.topleft
             self.hit_timer += 1
             if self.hit_timer >= self.hit_delay:
                 # Время истекло, игра заканчивается
@@ -54,9 +61,13 @@ class EnemyManager:
             # Продолжаем игру до окончания таймера
             return None
         
-        # Обновляем существующих врагов
-        for enemy in self.enemies:
-            enemy.update(player, level, player.flashlight.on)
+        # Поле путей пересчитывается только при переходе игрока в другую клетку
+        level.flow_field.update(player.rect.centerx, player.rect.centery)
+        
+        # Обновляем существующих врагов (попадание в свет считается сразу для всех)
+        light_flags = self._compute_light_flags(player, level)
+        for enemy, in_light in zip(self.enemies, light_flags):
+            enemy.update(player, level, player.flashlight.on, in_light)
         
         # Проверяем столкновения с игроком
         for enemy in self.enemies:
@@ -74,47 +85,41 @@ class EnemyManager:
         
         return None
     
+    def _compute_light_flags(self, player, level):
+        """Какие враги в свете фонарика: расстояние и конус - одним векторным проходом, стены - только для прошедших"""
+        if not self.enemies:
+            return []
+        
+        flashlight = player.flashlight
+        player_x, player_y = player.rect.center
+        centers = np.array([enemy.rect.center for enemy in self.enemies], dtype=float)
+        offset_x = centers[:, 0] - player_x
+        offset_y = centers[:, 1] - player_y
+        distance = np.sqrt(offset_x * offset_x + offset_y * offset_y)
+        
+        # Косинус угла между лучом фонарика и направлением на врага через скалярное произведение
+        facing = offset_x * math.cos(flashlight.angle) + offset_y * math.sin(flashlight.angle)
+        in_cone = ((distance <= flashlight.get_current_radius()) &
+                   (facing >= distance * math.cos(math.radians(LIGHT_ANGLE / 2))))
+        
+        light_flags = [False] * len(self.enemies)
+        for index in np.flatnonzero(in_cone):
+            enemy = self.enemies[index]
+            light_flags[index] = level.has_line_of_sight(player_x, player_y,
+                                                         enemy.rect.centerx, enemy.rect.centery)
+        return light_flags
+    
     def _update_room_context(self, player, level):
         """Обновляет информацию о том, в какой комнате находится игрок и какие комнаты соседние"""
-        # Проверяем, в какой комнате находится игрок
-        player_room = None
-        for room in level.rooms:
-            if room.rect.collidepoint(player.rect.centerx, player.rect.centery):
-                player_room = room
-                break
+        # Область игрока берется из сетки областей уровня; соседи - из графа комнат,
+        # поэтому пересчет нужен только при переходе в другую область
+        region = level.get_region(player.rect.centerx, player.rect.centery)
+        if region == self.current_region:
+            return
         
-        # Если игрок в комнате, находим соседние комнаты (те, которые соединены коридорами)
-        if player_room:
-            self.current_room = player_room
-            self.near_rooms = []
-            
-            # Проверяем каждую дверь текущей комнаты
-            for door in player_room.doors:
-                # Ищем комнату, к которой ведет эта дверь
-                for room in level.rooms:
-                    if room == player_room:
-                        continue
-                    
-                    # Проверяем, соединена ли эта комната с текущей комнатой
-                    for corridor in level.corridors:
-                        if corridor.colliderect(door["rect"]):
-                            # Проверяем, соединяет ли этот коридор с другой комнатой
-                            for other_door in room.doors:
-                                if corridor.colliderect(other_door["rect"]):
-                                    self.near_rooms.append(room)
-                                    break
-        else:
-            # Если игрок не в комнате, проверяем коридоры
-            for corridor in level.corridors:
-                if corridor.collidepoint(player.rect.centerx, player.rect.centery):
-                    # Находим комнаты, соединенные этим коридором
-                    for room in level.rooms:
-                        for door in room.doors:
-                            if corridor.colliderect(door["rect"]):
-                                self.near_rooms.append(room)
-            
-            # Если игрок не в комнате, текущая комната отсутствует
-            self.current_room = None
+        self.current_region = region
+        self.current_room = level.get_region_room(region)
+        self.near_rooms = level.get_adjacent_rooms(region)
     
     def _initial_spawn(self, player, level):
         """Создает начальных врагов при старте уровня в соответствующих комнатах"""
@@ -133,7 +138,7 @@ class EnemyManager:
                 for i in range(shadow_count):
                     if i < len(room.enemy_spawn_points):
                         x, y = room.enemy_spawn_points[i]
-                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                         # Передаем звуковой менеджер
                         if self.sound_manager:
                             enemy.sound_manager = self.sound_manager
@@ -144,7 +149,7 @@ class EnemyManager:
                     ghost_count = min(2, len(room.enemy_spawn_points) - shadow_count)
                     for i in range(ghost_count):
                         x, y = room.enemy_spawn_points[shadow_count + i]
-                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                         # Передаем звуковой менеджер
                         if self.sound_manager:
                             enemy.sound_manager = self.sound_manager
@@ -159,9 +164,9 @@ class EnemyManager:
                     x, y = room.enemy_spawn_points[i]
                     # Чередуем типы врагов
                     if i % 2 == 0:
-                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                     else:
-                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                     # Передаем звуковой менеджер
                     if self.sound_manager:
                         enemy.sound_manager = self.sound_manager
@@ -202,19 +207,19 @@ class EnemyManager:
         # Стратегия 1: Спавн в соседних комнатах (но не в текущей)
         if self.near_rooms:
             # Выбираем случайную соседнюю комнату
-            spawn_room = random.choice(self.near_rooms)
+            spawn_room = self.random.choice(self.near_rooms)
             
             # Проверяем, есть ли в ней точки спавна
             if spawn_room.enemy_spawn_points:
-                x, y = random.choice(spawn_room.enemy_spawn_points)
+                x, y = self.random.choice(spawn_room.enemy_spawn_points)
                 
                 # Проверяем, не слишком ли близко к игроку
                 distance = math.sqrt((player.rect.centerx - x)**2 + (player.rect.centery - y)**2)
                 if distance >= self.min_spawn_distance:
                     if enemy_type == "shadow":
-                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                     elif enemy_type == "ghost":
-                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                     
                     # Передаем звуковой менеджер врагу
                     if self.sound_manager:
@@ -240,11 +245,11 @@ class EnemyManager:
                     valid_points.append((x, y))
             
             if valid_points:
-                x, y = random.choice(valid_points)
+                x, y = self.random.choice(valid_points)
                 if enemy_type == "shadow":
-                    enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                    enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                 elif enemy_type == "ghost":
-                    enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                    enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                 
                 # Передаем звуковой менеджер врагу
                 if self.sound_manager:
@@ -262,10 +267,10 @@ class EnemyManager:
         
         for _ in range(max_attempts):
             # Генерируем случайный угол
-            angle = random.uniform(0, 2 * math.pi)
+            angle = self.random.uniform(0, 2 * math.pi)
             
             # Генерируем случайное расстояние в заданном диапазоне
-            distance = random.uniform(self.min_spawn_distance, self.max_spawn_distance)
+            distance = self.random.uniform(self.min_spawn_distance, self.max_spawn_distance)
             
             # Вычисляем координаты
             x = player.rect.centerx + math.cos(angle) * distance
@@ -275,6 +280,10 @@ class EnemyManager:
             if x < 50 or x > MAP_WIDTH - 50 or y < 50 or y > MAP_HEIGHT - 50:
                 continue
             
+            # Быстро отбрасываем точки внутри сплошного камня
+            if level.is_wall_at(x, y):
+                continue
+            
             # Проверяем, не в стартовой ли или финальной комнате
             in_special_room = False
             for room in level.rooms:
@@ -295,18 +304,14 @@ class EnemyManager:
             )
             
             # Проверяем коллизии со стенами
-            wall_collision = False
-            for wall in level.walls:
-                if test_rect.colliderect(wall):
-                    wall_collision = True
-                    break
+            wall_collision = level.check_wall_collision(test_rect)
             
             if not wall_collision:
                 # Создаем врага нужного типа
                 if enemy_type == "shadow":
-                    enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                    enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                 elif enemy_type == "ghost":
-                    enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                    enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                 
                 # Передаем звуковой менеджер врагу
                 if self.sound_manager:
@@ -325,13 +330,13 @@ class EnemyManager:
         
         if eligible_rooms:
             # Выбираем случайную подходящую комнату
-            room = random.choice(eligible_rooms)
+            room = self.random.choice(eligible_rooms)
             
             # Увеличиваем отступ от стен для большей безопасности
             padding = WALL_THICKNESS + 70  # Увеличено с 50
             for _ in range(30):  # Увеличиваем количество попыток с 20 до 30
-                x = random.randint(room.rect.x + padding, room.rect.x + room.rect.width - padding)
-                y = random.randint(room.rect.y + padding, room.rect.y + room.rect.height - padding)
+                x = self.random.randint(room.rect.x + padding, room.rect.x + room.rect.width - padding)
+                y = self.random.randint(room.rect.y + padding, room.rect.y + room.rect.height - padding)
                 
                 # Создаем временный прямоугольник с увеличенным запасом для проверки коллизий
                 safety_margin = 15  # Добавляем запас безопасности
@@ -343,18 +348,14 @@ class EnemyManager:
                 )
                 
                 # Проверяем коллизии со ВСЕМИ стенами и препятствиями
-                wall_collision = False
-                for wall in level.walls:
-                    if test_rect.colliderect(wall):
-                        wall_collision = True
-                        break
+                wall_collision = level.check_wall_collision(test_rect)
                 
                 if not wall_collision:
                     # Создаем врага нужного типа
                     if enemy_type == "shadow":
-                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                     elif enemy_type == "ghost":
-                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                        enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                     
                     # Передаем звуковой менеджер врагу
                     if self.sound_manager:
@@ -366,8 +367,12 @@ class EnemyManager:
         # Если всё-таки не получилось, пробуем старый метод случайного размещения
         # с дополнительными проверками
         for _ in range(30):  # Увеличим количество попыток
-            x = random.randint(150, MAP_WIDTH - 150)  # Увеличиваем отступ от краев
-            y = random.randint(150, MAP_HEIGHT - 150)
+            x = self.random.randint(150, MAP_WIDTH - 150)  # Увеличиваем отступ от краев
+            y = self.random.randint(150, MAP_HEIGHT - 150)
+            
+            # Быстро отбрасываем точки внутри сплошного камня
+            if level.is_wall_at(x, y):
+                continue
             
             # Проверяем, не в стартовой ли или финальной комнате
             in_special_room = False
@@ -389,18 +394,14 @@ class EnemyManager:
             )
             
             # Проверка ВСЕХ возможных коллизий
-            wall_collision = False
-            for wall in level.walls:
-                if test_rect.colliderect(wall):
-                    wall_collision = True
-                    break
+            wall_collision = level.check_wall_collision(test_rect)
             
             if not wall_collision:
                 # Создаем врага нужного типа
                 if enemy_type == "shadow":
-                    enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                    enemy = ShadowEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                 elif enemy_type == "ghost":
-                    enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2)
+                    enemy = GhostEnemy(x - ENEMY_SIZE/2, y - ENEMY_SIZE/2, rng=self._enemy_random())
                 
                 # Передаем звуковой менеджер врагу
                 if self.sound_manager:
@@ -412,6 +413,10 @@ class EnemyManager:
         # Если все попытки не удались, просто возвращаем False
         return False
     
+    def _enemy_random(self):
+        """Отдельный генератор для нового врага, порожденный генератором менеджера"""
+        return random.Random(self.random.getrandbits(32))
+    
     def draw(self, screen, camera):
         """Отрисовка всех врагов"""
         for enemy in self.enemies:
@@ -423,5 +428,6 @@ class EnemyManager:
         self.shadow_spawn_timer = 0
         self.ghost_spawn_timer = 0
         self.initial_spawn_done = False
+        self.current_region = None
         self.current_room = None
         self.near_rooms = []
\ No newline at end of file
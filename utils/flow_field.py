@@ -0,0 +1,225 @@
+import heapq
+from array import array
+import pygame
+from levels.tile_map import TILE_SOLID, TILE_OBSTACLE
+
+# Соседние клетки: сначала по сторонам, затем по диагонали
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+# Стоимость шага: по стороне, по диагонали и доплата за клетку с препятствием
+STEP_COST = 2
+DIAGONAL_COST = 3
+OBSTACLE_COST = 2
+
+
+class RegionDistances(dict):
+    """Расстояния только для клеток одной области: индекс -> расстояние, остальные -1"""
+
+    def __missing__(self, index):
+        return -1
+
+
+class FlowField:
+    """Общее для всех врагов поле направлений к игроку (пересчет при смене клетки игрока)"""
+
+    def __init__(self, tile_map, collides, agent_size, radius=None, graph=None):
+        self.tile_map = tile_map
+        self.agent_size = agent_size
+        self.max_distance = None if radius is None else radius * STEP_COST // tile_map.tile_size
+        if graph is None:
+            self.anchors = self._find_anchors(collides)
+            self.links = self._build_links(collides)
+        else:
+            # Готовый граф клеток (опорные точки, соседи) из кеша уровня
+            self.anchors, self.links = graph
+        self.distances = array('i', [-1]) * (tile_map.cols * tile_map.rows)
+        self.target = None
+        self.rebuilds = 0
+
+    def _agent_rect(self, x, y):
+        """Прямоугольник врага с центром в точке (x, y)"""
+        rect = pygame.Rect(0, 0, self.agent_size, self.agent_size)
+        rect.center = (x, y)
+        return rect
+
+    def _find_anchors(self, collides):
+        """Для каждой клетки - ближайшая к ее центру точка, где помещается враг (None - не помещается)"""
+        # Препятствия не совпадают с сеткой, поэтому свободное место ищется со сдвигом внутри клетки
+        tile_map = self.tile_map
+        size = tile_map.tile_size
+        limit = size // 2 - 5
+        offsets = sorted(((offset_x, offset_y)
+                          for offset_x in range(-limit, limit + 1, 5)
+                          for offset_y in range(-limit, limit + 1, 5)),
+                         key=lambda offset: offset[0] ** 2 + offset[1] ** 2)
+
+        anchors = [None] * (tile_map.cols * tile_map.rows)
+        for index in range(len(anchors)):
+            col, row = index % tile_map.cols, index // tile_map.cols
+            if tile_map.get(col, row) == TILE_SOLID:
+                continue
+            center_x = col * size + size // 2
+            center_y = row * size + size // 2
+            for offset_x, offset_y in offsets:
+                if not collides(self._agent_rect(center_x + offset_x, center_y + offset_y)):
+                    anchors[index] = (center_x + offset_x, center_y + offset_y)
+                    break
+        return anchors
+
+    def _can_travel(self, start, end, collides):
+        """Проходит ли враг от точки start до end напрямую или с одним поворотом"""
+        # Упершись по одной оси, враг идет по другой - путь "буквой Г" тоже проходим
+        for corner in (start, (end[0], start[1]), (start[0], end[1])):
+            first = self._agent_rect(*start).union(self._agent_rect(*corner))
+            second = self._agent_rect(*corner).union(self._agent_rect(*end))
+            if not collides(first) and not collides(second):
+                return True
+        return False
+
+    def _build_links(self, collides):
+        """Для каждой клетки - кортеж (индекс соседа, стоимость шага)"""
+        tile_map = self.tile_map
+        cols = tile_map.cols
+        count = cols * tile_map.rows
+
+        anchors = self.anchors
+
+        # Переходы по сторонам: враг проходит весь путь между опорными точками клеток
+        straight = set()
+        for index in range(count):
+            if not anchors[index]:
+                continue
+            col, row = index % cols, index // cols
+            for next_col, next_row in ((col + 1, row), (col, row + 1)):
+                next_index = next_row * cols + next_col
+                if not tile_map.in_bounds(next_col, next_row) or not anchors[next_index]:
+                    continue
+                if self._can_travel(anchors[index], anchors[next_index], collides):
+                    straight.add((index, next_index))
+                    straight.add((next_index, index))
+
+        links = [()] * count
+        for index in range(count):
+            if not anchors[index]:
+                continue
+            col, row = index % cols, index // cols
+            neighbors = []
+            for step_col, step_row in NEIGHBORS:
+                next_col, next_row = col + step_col, row + step_row
+                next_index = next_row * cols + next_col
+                if not tile_map.in_bounds(next_col, next_row):
+                    continue
+                if step_col and step_row:
+                    # Диагональ - только если обе обходные клетки тоже проходимы (без срезания углов)
+                    side_x = row * cols + next_col
+                    side_y = next_row * cols + col
+                    if not ((index, side_x) in straight and (side_x, next_index) in straight
+                            and (index, side_y) in straight and (side_y, next_index) in straight):
+                        continue
+                    cost = DIAGONAL_COST
+                elif (index, next_index) in straight:
+                    cost = STEP_COST
+                else:
+                    continue
+                if tile_map.get(next_col, next_row) == TILE_OBSTACLE:
+                    cost += OBSTACLE_COST
+                neighbors.append((next_index, cost))
+            links[index] = tuple(neighbors)
+        return links
+
+    def index_at(self, x, y):
+        """Индекс клетки, в которую попадает точка, или None за пределами карты"""
+        size = self.tile_map.tile_size
+        col = int(x // size)
+        row = int(y // size)
+        if not self.tile_map.in_bounds(col, row):
+            return None
+        return row * self.tile_map.cols + col
+
+    def compute_distances(self, sources, regions=None, region=None, max_distance=None):
+        """Дейкстра по графу клеток от источников [(индекс, расстояние), ...] не дальше max_distance"""
+        # Внутри области (regions, region) хранятся расстояния только ее клеток
+        if regions is None:
+            distances = array('i', [-1]) * len(self.links)
+        else:
+            distances = RegionDistances()
+        queue = []
+        for index, distance in sources:
+            if distances[index] == -1 or distance < distances[index]:
+                distances[index] = distance
+                queue.append((distance, index))
+        heapq.heapify(queue)
+
+        links = self.links
+        while queue:
+            distance, index = heapq.heappop(queue)
+            if distance > distances[index]:
+                continue
+            for next_index, cost in links[index]:
+                next_distance = distance + cost
+                if max_distance is not None and next_distance > max_distance:
+                    continue
+                if regions is not None and regions[next_index] != region:
+                    continue
+                if distances[next_index] == -1 or next_distance < distances[next_index]:
+                    distances[next_index] = next_distance
+                    heapq.heappush(queue, (next_distance, next_index))
+        return distances
+
+    def update(self, x, y):
+        """Пересчитывает поле, если точка (x, y) оказалась в новой клетке"""
+        size = self.tile_map.tile_size
+        target = (int(x // size), int(y // size))
+        if target == self.target or not self.tile_map.in_bounds(*target):
+            return False
+
+        self.target = target
+        self.rebuilds += 1
+        cols = self.tile_map.cols
+        start = target[1] * cols + target[0]
+        sources = [(start, 0)]
+        if not self.links[start]:
+            # Враг в клетке игрока не помещается - подходим к ней из любой соседней
+            for step_col, step_row in NEIGHBORS:
+                next_col, next_row = target[0] + step_col, target[1] + step_row
+                next_index = next_row * cols + next_col
+                if self.tile_map.in_bounds(next_col, next_row) and self.links[next_index]:
+                    sources.append((next_index, STEP_COST))
+        self.distances = self.compute_distances(sources, max_distance=self.max_distance)
+        return True
+
+    def next_step(self, x, y, distances=None):
+        """Опорная точка соседней клетки, ведущей к цели поля distances (по умолчанию - к игроку)"""
+        if distances is None:
+            distances = self.distances
+        index = self.index_at(x, y)
+        if index is None:
+            return None
+
+        cols = self.tile_map.cols
+        if self.links[index]:
+            candidates = [next_index for next_index, cost in self.links[index]]
+        else:
+            # Враг стоит в клетке, где целиком не помещается: выходим в любую соседнюю
+            col, row = index % cols, index // cols
+            candidates = [(row + step_row) * cols + col + step_col for step_col, step_row in NEIGHBORS
+                          if self.tile_map.in_bounds(col + step_col, row + step_row)]
+
+        best = None
+        best_distance = distances[index]
+        for next_index in candidates:
+            distance = distances[next_index]
+            if distance == -1:
+                continue
+            # По диагонали - только если обе обходные клетки тоже в поле: враг не должен
+            # срезать угол через клетку чужой области
+            side_x = index - index % cols + next_index % cols
+            side_y = next_index - next_index % cols + index % cols
+            if side_x != index and side_y != index and (distances[side_x] == -1 or distances[side_y] == -1):
+                continue
+            if best_distance == -1 or distance < best_distance:
+                best = next_index
+                best_distance = distance
+
+        if best is None:
+            return None
+        return self.anchors[best]
@@ -0,0 +1,113 @@
+import os
+import time
+
+# Без окна и аудиоустройства: драйверы SDL-заглушки нужно выбрать до pygame.init()
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from settings import *
+from scenes.game_level import GameLevel
+from utils.sound_manager import NullSoundManager
+from utils.input_source import RandomInput, ScriptedInput
+from utils.text_cache import text_cache
+from utils.asset_manager import assets
+
+
+class HeadlessRunner:
+    """Прогон уровней без окна и звука для нагрузочных тестов и замеров"""
+
+    def __init__(self, input_source, draw=False, seed=None):
+        pygame.init()
+        # Окно-заглушка нужно для convert_alpha() при загрузке спрайтов
+        pygame.display.set_mode((1, 1))
+        assets.preload()
+        self.input_source = input_source
+        # Уровни прогона получают зерна seed, seed + 1, ... (None - случайные карты)
+        self.seed = seed
+        self.sound_manager = NullSoundManager()
+        self.surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) if draw else None
+
+        self.update_times = []
+        self.draw_times = []
+        self.load_times = []
+        self.outcomes = {"game_over": 0, "level_complete": 0}
+        self.flow_field_rebuilds = 0
+        self.game = None
+
+    def _new_level(self):
+        seed = None if self.seed is None else self.seed + len(self.load_times)
+        start = time.perf_counter()
+        self.game = GameLevel(self.sound_manager, self.input_source, seed)
+        self.load_times.append(time.perf_counter() - start)
+
+    def _finish_level(self):
+        self.flow_field_rebuilds += self.game.level.flow_field.rebuilds
+
+    def run(self, frames):
+        self._new_level()
+        for frame in range(frames):
+            start = time.perf_counter()
+            self.game.update()
+            self.update_times.append(time.perf_counter() - start)
+
+            if self.surface is not None:
+                start = time.perf_counter()
+                self.game.draw(self.surface)
+                self.draw_times.append(time.perf_counter() - start)
+
+            if self.game.game_state in self.outcomes:
+                self.outcomes[self.game.game_state] += 1
+                self._finish_level()
+                self._new_level()
+        self._finish_level()
+        return self.stats()
+
+    def stats(self):
+        """Сводка прогона: скорость логики, исходы и счетчики кешей уровня"""
+        total = sum(self.update_times)
+        stats = {
+            "frames": len(self.update_times),
+            "levels": len(self.load_times),
+            "updates_per_second": len(self.update_times) / total if total else 0.0,
+            "update_ms_mean": total * 1000 / len(self.update_times) if self.update_times else 0.0,
+            "update_ms_max": max(self.update_times, default=0.0) * 1000,
+            "load_ms_mean": sum(self.load_times) * 1000 / len(self.load_times) if self.load_times else 0.0,
+            "outcomes": dict(self.outcomes),
+            "flow_field_rebuilds": self.flow_field_rebuilds,
+            "los_cache": self.game.level.los_cache.stats(),
+            "wall_merge": self.game.level.wall_merge_stats
+        }
+        if self.draw_times:
+            stats["draw_ms_mean"] = sum(self.draw_times) * 1000 / len(self.draw_times)
+            stats["draw_ms_max"] = max(self.draw_times) * 1000
+            stats["wall_layer"] = self.game.level.wall_layer.stats() if self.game.level.wall_layer else {}
+            stats["text_cache"] = text_cache.stats()
+        return stats
+
+
+def run_headless(frames, input_mode="random", script=None, draw=False, seed=None):
+    """Запускает прогон без окна и печатает статистику"""
+    if input_mode == "scripted":
+        input_source = ScriptedInput.from_file(script)
+    else:
+        input_source = RandomInput(seed)
+
+    runner = HeadlessRunner(input_source, draw, seed)
+    stats = runner.run(frames)
+    pygame.quit()
+
+    print(f"Обновлений: {stats['frames']}, уровней: {stats['levels']}, зерно: {seed}")
+    print(f"Скорость логики: {stats['updates_per_second']:.0f} обновлений/с "
+          f"(среднее {stats['update_ms_mean']:.3f} мс, максимум {stats['update_ms_max']:.3f} мс)")
+    print(f"Генерация уровня: {stats['load_ms_mean']:.1f} мс в среднем")
+    if "draw_ms_mean" in stats:
+        print(f"Отрисовка: {stats['draw_ms_mean']:.3f} мс в среднем, максимум {stats['draw_ms_max']:.3f} мс")
+        print(f"Кеш кусков слоя стен (последний уровень): {stats['wall_layer']}")
+        print(f"Кеш текста: {stats['text_cache']}")
+    print(f"Исходы: проигрышей {stats['outcomes']['game_over']}, "
+          f"пройдено уровней {stats['outcomes']['level_complete']}")
+    print(f"Пересчетов поля преследования: {stats['flow_field_rebuilds']}")
+    print(f"Кеш видимости (последний уровень): {stats['los_cache']}")
+    print(f"Объединение стен (последний уровень): {stats['wall_merge']}")
+    return stats
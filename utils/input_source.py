@@ -0,0 +1,83 @@
+import json
+import random
+import pygame
+from settings import *
+
+# Клавиши движения игрока
+MOVEMENT_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d)
+
+
+class PressedKeys:
+    """Набор зажатых клавиш с тем же доступом, что у pygame.key.get_pressed()"""
+
+    def __init__(self, keys=()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class KeyboardInput:
+    """Ввод с клавиатуры и мыши (обычная игра)"""
+
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+    def get_mouse_pos(self):
+        return pygame.mouse.get_pos()
+
+    def update(self):
+        pass
+
+
+class RandomInput:
+    """Случайный ввод для прогонов без окна: игрок бродит и водит фонариком"""
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.keys = PressedKeys()
+        self.mouse_pos = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.timer = 0
+
+    def get_pressed(self):
+        return self.keys
+
+    def get_mouse_pos(self):
+        return self.mouse_pos
+
+    def update(self):
+        """Раз в 0.3-1.5 секунды меняет направление движения и точку прицела"""
+        self.timer -= 1
+        if self.timer > 0:
+            return
+        self.timer = self.random.randint(20, 90)
+        self.keys = PressedKeys(key for key in MOVEMENT_KEYS if self.random.random() < 0.35)
+        self.mouse_pos = (self.random.randrange(SCREEN_WIDTH), self.random.randrange(SCREEN_HEIGHT))
+
+
+class ScriptedInput:
+    """Ввод по сценарию: повторяющийся список шагов (число обновлений, клавиши "wasd", позиция мыши)"""
+
+    def __init__(self, steps):
+        self.steps = [(frames, PressedKeys(pygame.key.key_code(key) for key in keys), tuple(mouse_pos))
+                      for frames, keys, mouse_pos in steps]
+        self.step = 0
+        self.timer = 0
+
+    @classmethod
+    def from_file(cls, path):
+        """Загружает сценарий из JSON: [[60, "wd", [800, 360]], ...]"""
+        with open(path, encoding="utf-8") as script_file:
+            return cls(json.load(script_file))
+
+    def get_pressed(self):
+        return self.steps[self.step][1]
+
+    def get_mouse_pos(self):
+        return self.steps[self.step][2]
+
+    def update(self):
+        self.timer += 1
+        if self.timer > self.steps[self.step][0]:
+            self.timer = 1
+            self.step = (self.step + 1) % len(self.steps)
@@ -0,0 +1,70 @@
+import math
+from collections import OrderedDict
+
+
+class LineOfSightCache:
+    """Ограниченный LRU-кеш прямой видимости между клетками уровня (ключ - пара клеток без учета порядка)"""
+
+    def __init__(self, level, max_size=4096):
+        self.level = level
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Проверяет, видна ли точка (x2, y2) из точки (x1, y1)"""
+        tile_size = self.level.tile_map.tile_size
+        source = (int(x1 // tile_size), int(y1 // tile_size))
+        target = (int(x2 // tile_size), int(y2 // tile_size))
+        key = (source, target) if source <= target else (target, source)
+
+        visible = self.entries.get(key)
+        if visible is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return visible
+
+        self.misses += 1
+        visible = self._trace(*key)
+        self.entries[key] = visible
+        if len(self.entries) > self.max_size:
+            # Вытесняем давно не использованную пару
+            self.entries.popitem(last=False)
+        return visible
+
+    def _trace(self, source, target):
+        """Обходит клетки между центрами source и target и ищет препятствия"""
+        # Загораживают только стены между клетками, сами конечные клетки не проверяются
+        if source == target:
+            return True
+
+        tile_map = self.level.tile_map
+        half = tile_map.tile_size / 2
+        x1 = source[0] * tile_map.tile_size + half
+        y1 = source[1] * tile_map.tile_size + half
+        dx = target[0] * tile_map.tile_size + half - x1
+        dy = target[1] * tile_map.tile_size + half - y1
+        distance = math.hypot(dx, dy)
+        dir_x = dx / distance
+        dir_y = dy / distance
+
+        for col, row, tile, t_enter, t_exit in tile_map.traverse(x1, y1, dir_x, dir_y, distance):
+            if (col, row) == source:
+                continue
+            if (col, row) == target:
+                break
+            if self.level.tile_hit_distance(col, row, tile, x1, y1, dir_x, dir_y, t_enter, t_exit) is not None:
+                return False
+        return True
+
+    def stats(self):
+        """Счетчики попаданий и промахов для подбора размера кеша"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hit_rate": self.hits / total if total else 0.0
+        }
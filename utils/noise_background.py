@@ -0,0 +1,50 @@
+import os
+import numpy as np
+import pygame
+from settings import *
+
+# Размер "пикселя" шума и максимальная яркость
+NOISE_CELL = 4
+NOISE_MAX = 20
+
+# Готовые фоны по разрешению - общие для всех сцен (сцены фон только копируют на экран)
+_backgrounds = {}
+
+
+def _noise_path(width, height):
+    return os.path.join(BACKGROUND_CACHE_DIR, f"noise_{width}x{height}.npy")
+
+
+def _create_noise(width, height):
+    """Яркость каждой клетки шума 4x4 (из файла кеша, если он включен и есть)"""
+    shape = (-(-width // NOISE_CELL), -(-height // NOISE_CELL))
+    if BACKGROUND_CACHE_ENABLED:
+        try:
+            noise = np.load(_noise_path(width, height))
+            if noise.shape == shape:
+                return noise
+        except (OSError, ValueError):
+            pass
+
+    noise = np.random.randint(0, NOISE_MAX + 1, shape, dtype=np.uint8)
+    if BACKGROUND_CACHE_ENABLED:
+        try:
+            os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+            np.save(_noise_path(width, height), noise)
+        except OSError as e:
+            print(f"Не удалось сохранить фон в кеш. Ошибка: {e}")
+    return noise
+
+
+def dark_background(width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """Темный фон меню с шумом клетками 4x4, создается один раз на разрешение"""
+    background = _backgrounds.get((width, height))
+    if background is None:
+        noise = _create_noise(width, height)
+        pixels = noise.repeat(NOISE_CELL, axis=0).repeat(NOISE_CELL, axis=1)[:width, :height]
+        background = pygame.surfarray.make_surface(np.dstack((pixels, pixels, pixels)))
+        if pygame.display.get_surface() is not None:
+            # Формат экрана - чтобы копирование фона каждый кадр не конвертировало пиксели
+            background = background.convert()
+        _backgrounds[(width, height)] = background
+    return background
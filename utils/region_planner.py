@@ -0,0 +1,236 @@
+import heapq
+from array import array
+from collections import deque
+from utils.flow_field import NEIGHBORS, STEP_COST
+
+# Стоимость перехода через проход между областями (чтобы не петлять через двери)
+PORTAL_COST = 2
+
+
+class RegionPlanner:
+    """Иерархический поиск пути: граф областей и проходов, внутри области - локальные поля"""
+
+    def __init__(self, flow_field, region_map, layout=None):
+        self.flow_field = flow_field
+
+        # Проходы: (область, соседняя область, [(клетка в области, клетка в соседней), ...], опорная клетка за проходом)
+        self.doors = []
+        # Номера проходов, ведущих из области и в область
+        self.exits = {}
+        self.entrances = {}
+
+        if layout is None:
+            self.regions = self._assign_regions(region_map)
+            self._build_doors()
+            # Локальные поля строятся сразу, чтобы в игре не было всплесков; маршруты - по запросу
+            self.local_fields = [self._build_local_field(door) for door in range(len(self.doors))]
+        else:
+            # Области, проходы и локальные поля из кеша уровня
+            self.regions, doors, self.local_fields = layout
+            for door in doors:
+                self._add_door(*door)
+        self._routes = {}
+        # Поле внутри области игрока к его клетке (для врагов за пределами общего поля)
+        self._target_field = None
+
+    def _assign_regions(self, region_map):
+        """Область для каждой проходимой клетки (несвязные части области получают свои номера)"""
+        # Клетки вне комнат и коридоров (края вырезанных коридоров) присоединяются к ближайшей по графу области
+        links = self.flow_field.links
+        regions = array('h', region_map)
+        queue = deque()
+        for index in range(len(regions)):
+            if not links[index]:
+                regions[index] = -1
+            elif regions[index] != -1:
+                queue.append(index)
+
+        while queue:
+            index = queue.popleft()
+            for next_index, cost in links[index]:
+                if regions[next_index] == -1:
+                    regions[next_index] = regions[index]
+                    queue.append(next_index)
+
+        # Область может распасться на части (препятствие перегородило комнату) - внутри
+        # каждой части все клетки должны быть достижимы друг из друга
+        next_region = max(regions, default=-1) + 1
+        numbered = set()
+        visited = bytearray(len(regions))
+        for start in range(len(regions)):
+            region = regions[start]
+            if region == -1 or visited[start]:
+                continue
+            if region in numbered:
+                new_region = next_region
+                next_region += 1
+            else:
+                new_region = region
+                numbered.add(region)
+
+            visited[start] = 1
+            regions[start] = new_region
+            queue.append(start)
+            while queue:
+                index = queue.popleft()
+                for next_index, cost in links[index]:
+                    if not visited[next_index] and regions[next_index] == region:
+                        visited[next_index] = 1
+                        regions[next_index] = new_region
+                        queue.append(next_index)
+        return regions
+
+    def _build_doors(self):
+        """Находит проходы между соседними областями (связные группы переходов клеток)"""
+        regions = self.regions
+        links = self.flow_field.links
+        crossings = {}
+        for index, neighbors in enumerate(links):
+            region = regions[index]
+            if region == -1:
+                continue
+            for next_index, cost in neighbors:
+                next_region = regions[next_index]
+                if next_region != -1 and next_region != region:
+                    crossings.setdefault((region, next_region), {}).setdefault(index, []).append(next_index)
+
+        cols = self.flow_field.tile_map.cols
+        for (region, next_region), tiles in crossings.items():
+            unvisited = set(tiles)
+            while unvisited:
+                # Связная группа граничных клеток - отдельный проход
+                group = [unvisited.pop()]
+                for index in group:
+                    for next_index, cost in links[index]:
+                        if next_index in unvisited:
+                            unvisited.remove(next_index)
+                            group.append(next_index)
+
+                pairs = [(index, next_index) for index in group for next_index in tiles[index]]
+                middle_col = sum(next_index % cols for index, next_index in pairs) / len(pairs)
+                middle_row = sum(next_index // cols for index, next_index in pairs) / len(pairs)
+                entry = min((next_index for index, next_index in pairs),
+                            key=lambda tile: (tile % cols - middle_col) ** 2 + (tile // cols - middle_row) ** 2)
+
+                self._add_door(region, next_region, pairs, entry)
+
+    def _add_door(self, region, next_region, pairs, entry):
+        door = len(self.doors)
+        self.doors.append((region, next_region, pairs, entry))
+        self.exits.setdefault(region, []).append(door)
+        self.entrances.setdefault(next_region, []).append(door)
+
+    def _build_local_field(self, door):
+        """Расстояния внутри области до прохода (источники - клетки сразу за ним)"""
+        region, next_region, pairs, entry = self.doors[door]
+        sources = [(next_index, 0) for index, next_index in pairs]
+        return self.flow_field.compute_distances(sources, self.regions, region)
+
+    def _target_sources(self, x, y):
+        """Область цели и клетки-источники для поиска к ней (соседние, если враг в клетке цели не помещается)"""
+        index = self.flow_field.index_at(x, y)
+        if index is None:
+            return -1, []
+        if self.regions[index] != -1:
+            return self.regions[index], [(index, 0)]
+
+        cols = self.flow_field.tile_map.cols
+        col, row = index % cols, index // cols
+        region = -1
+        sources = []
+        for step_col, step_row in NEIGHBORS:
+            if not self.flow_field.tile_map.in_bounds(col + step_col, row + step_row):
+                continue
+            next_index = (row + step_row) * cols + col + step_col
+            if self.regions[next_index] != -1 and region in (-1, self.regions[next_index]):
+                region = self.regions[next_index]
+                sources.append((next_index, STEP_COST))
+        return region, sources
+
+    def _region_field(self, x, y):
+        """Расстояния внутри области цели до ее клетки (пересчет только при смене клетки)"""
+        index = self.flow_field.index_at(x, y)
+        if self._target_field is None or self._target_field[0] != index:
+            region, sources = self._target_sources(x, y)
+            self._target_field = (index, self.flow_field.compute_distances(sources, self.regions, region))
+        return self._target_field[1]
+
+    def _route(self, target):
+        """Стоимость пути до области target от каждого прохода и следующий проход (кешируется)"""
+        # Обратный Дейкстра по проходам: стоимость вдоль цепочки следующих проходов убывает, маршрут не зацикливается
+        route = self._routes.get(target)
+        if route is not None:
+            return route
+
+        costs = {}
+        successors = {}
+        queue = []
+        for door in self.entrances.get(target, ()):
+            costs[door] = PORTAL_COST
+            successors[door] = None
+            queue.append((PORTAL_COST, door))
+
+        while queue:
+            cost, door = heapq.heappop(queue)
+            if cost > costs[door]:
+                continue
+            # В область, из которой ведет этот проход, можно попасть через ее входы
+            region = self.doors[door][0]
+            for previous in self.entrances.get(region, ()):
+                if self.doors[previous][0] == target:
+                    continue
+                inside = self.local_fields[door][self.doors[previous][3]]
+                if inside == -1:
+                    continue
+                next_cost = cost + inside + PORTAL_COST
+                if previous not in costs or next_cost < costs[previous]:
+                    costs[previous] = next_cost
+                    successors[previous] = door
+                    heapq.heappush(queue, (next_cost, previous))
+
+        route = (costs, successors)
+        self._routes[target] = route
+        return route
+
+    def _next_door(self, index, target_region, route):
+        """Новый route (целевая область, проход) из клетки index в target_region или None"""
+        # Пока цель в той же области, враг держится выбранного в прошлый раз маршрута
+        region = self.regions[index]
+        costs, successors = self._route(target_region)
+        if route is not None and route[0] == target_region:
+            door = route[1]
+            if self.doors[door][0] == region:
+                return route
+            # Проход уже пройден - идем к следующему по маршруту
+            if self.doors[door][1] == region and successors.get(door) is not None:
+                return (target_region, successors[door])
+
+        best = None
+        best_cost = None
+        for door in self.exits.get(region, ()):
+            route_cost = costs.get(door)
+            inside = self.local_fields[door][index]
+            if route_cost is None or inside == -1:
+                continue
+            if best_cost is None or inside + route_cost < best_cost:
+                best = door
+                best_cost = inside + route_cost
+        if best is None:
+            return None
+        return (target_region, best)
+
+    def next_step(self, x, y, target_x, target_y, route=None):
+        """Опорная точка следующей клетки на пути к цели и route для следующего вызова"""
+        index = self.flow_field.index_at(x, y)
+        target_region = self._target_sources(target_x, target_y)[0]
+        if index is None or self.regions[index] == -1 or target_region == -1:
+            return None, None
+
+        if self.regions[index] == target_region:
+            # Цель в той же области - идем по полю внутри области
+            return self.flow_field.next_step(x, y, self._region_field(target_x, target_y)), None
+
+        route = self._next_door(index, target_region, route)
+        if route is None:
+            return None, None
+        return self.flow_field.next_step(x, y, self.local_fields[route[1]]), route
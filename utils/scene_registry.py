@@ -0,0 +1,37 @@
+from utils.startup_trace import startup_trace
+
+
+class SceneRegistry:
+    """Сцены игры (имя -> функция, создающая сцену), создаваемые при первом обращении"""
+
+    def __init__(self, factories):
+        self.factories = factories
+        self.scenes = {}
+        # Очередь прогрева: сцены строятся по одной в кадрах со свободным временем
+        self.warm_queue = []
+
+    def __getitem__(self, name):
+        scene = self.scenes.get(name)
+        if scene is None:
+            with startup_trace.section(f"сцена {name}"):
+                scene = self.factories[name]()
+            self.scenes[name] = scene
+        return scene
+
+    def __setitem__(self, name, scene):
+        self.scenes[name] = scene
+
+    def warm(self, *names):
+        """Ставит сцены в очередь на создание в свободное время"""
+        for name in names:
+            if name not in self.scenes and name not in self.warm_queue:
+                self.warm_queue.append(name)
+
+    def warm_next(self):
+        """Создает одну сцену из очереди прогрева; False, если очередь пуста"""
+        while self.warm_queue:
+            name = self.warm_queue.pop(0)
+            if name not in self.scenes:
+                self[name]
+                return True
+        return False
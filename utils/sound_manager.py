@@ -1,6 +1,7 @@
 import pygame
 import os
 from settings import *
+from utils.startup_trace import startup_trace
 
 class SoundManager:
     def __init__(self):
@@ -28,7 +29,8 @@ class SoundManager:
         }
         
         for name, filename in sound_files.items():
-            self.load_sound(name, filename)
+            with startup_trace.section(filename):
+                self.load_sound(name, filename)
             
     def load_sound(self, name, filename):
         """Загружает отдельный звуковой файл"""
@@ -96,4 +98,31 @@ class SoundManager:
         
         # Обновляем глобальную настройку громкости
         global MUSIC_VOLUME
-        MUSIC_VOLUME = volume
\ No newline at end of file
+        MUSIC_VOLUME = volume
+
+class NullSoundManager:
+    """Звуковой менеджер без звука: для прогонов без аудиоустройства"""
+
+    def __init__(self):
+        self.sounds = {}
+
+    def load_sounds(self):
+        pass
+
+    def load_sound(self, name, filename):
+        pass
+
+    def play_sound(self, name, loops=0):
+        pass
+
+    def play_menu_music(self):
+        pass
+
+    def stop_music(self):
+        pass
+
+    def set_sound_volume(self, volume):
+        pass
+
+    def set_music_volume(self, volume):
+        pass
@@ -0,0 +1,138 @@
+import math
+
+
+class SpatialGrid:
+    """Статический пространственный хеш для быстрых запросов к стенам уровня"""
+
+    def __init__(self, rects, cell_size=100):
+        self.cell_size = cell_size
+        self.rects = list(rects)
+
+        # Корзины: (столбец, строка) -> список индексов прямоугольников
+        self.cells = {}
+        for index, rect in enumerate(self.rects):
+            for key in self._cells_for_rect(rect):
+                self.cells.setdefault(key, []).append(index)
+
+    def _cells_for_rect(self, rect):
+        """Возвращает ключи всех ячеек, которые перекрывает прямоугольник"""
+        col_start = rect.left // self.cell_size
+        col_end = (rect.right - 1) // self.cell_size
+        row_start = rect.top // self.cell_size
+        row_end = (rect.bottom - 1) // self.cell_size
+        for col in range(col_start, col_end + 1):
+            for row in range(row_start, row_end + 1):
+                yield (col, row)
+
+    def query_rect(self, rect):
+        """Возвращает стены, которые перекрывают прямоугольник"""
+        found = set()
+        result = []
+        for key in self._cells_for_rect(rect):
+            for index in self.cells.get(key, ()):
+                if index not in found:
+                    found.add(index)
+                    if self.rects[index].colliderect(rect):
+                        result.append(self.rects[index])
+        return result
+
+    def query_rect_indices(self, rect):
+        """Возвращает индексы стен (в порядке списка), которые перекрывают прямоугольник"""
+        found = set()
+        for key in self._cells_for_rect(rect):
+            for index in self.cells.get(key, ()):
+                if index not in found and self.rects[index].colliderect(rect):
+                    found.add(index)
+        return sorted(found)
+
+    def collides(self, rect):
+        """Проверяет, пересекается ли прямоугольник хотя бы с одной стеной"""
+        for key in self._cells_for_rect(rect):
+            for index in self.cells.get(key, ()):
+                if self.rects[index].colliderect(rect):
+                    return True
+        return False
+
+    def query_segment(self, x1, y1, x2, y2, padding=0):
+        """Возвращает стены вдоль отрезка (с учетом отступа для толщины проверяющего прямоугольника)"""
+        found = set()
+        result = []
+        for key in self._cells_for_segment(x1, y1, x2, y2, padding):
+            for index in self.cells.get(key, ()):
+                if index in found:
+                    continue
+                found.add(index)
+                wall = self.rects[index]
+                if padding:
+                    wall = wall.inflate(padding * 2, padding * 2)
+                if wall.collidepoint(x1, y1) or wall.clipline(x1, y1, x2, y2):
+                    result.append(self.rects[index])
+        return result
+
+    def _cells_for_segment(self, x1, y1, x2, y2, padding):
+        """Перечисляет ячейки, через которые проходит отрезок (обход сетки по DDA)"""
+        size = self.cell_size
+        col = int(x1 // size)
+        row = int(y1 // size)
+        end_col = int(x2 // size)
+        end_row = int(y2 // size)
+
+        dx = x2 - x1
+        dy = y2 - y1
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+
+        # Расстояние (в долях отрезка) до первой границы ячейки и шаг между границами
+        if dx != 0:
+            next_x = (col + (1 if dx > 0 else 0)) * size
+            t_max_x = (next_x - x1) / dx
+            t_delta_x = size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            next_y = (row + (1 if dy > 0 else 0)) * size
+            t_max_y = (next_y - y1) / dy
+            t_delta_y = size / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        # Отступ может задеть соседние ячейки - добавляем окрестность
+        spread = 1 if padding else 0
+        visited = set()
+        steps = abs(end_col - col) + abs(end_row - row)
+        for _ in range(steps + 1):
+            for ncol in range(col - spread, col + spread + 1):
+                for nrow in range(row - spread, row + spread + 1):
+                    if (ncol, nrow) not in visited:
+                        visited.add((ncol, nrow))
+                        yield (ncol, nrow)
+            if t_max_x < t_max_y:
+                col += step_col
+                t_max_x += t_delta_x
+            else:
+                row += step_row
+                t_max_y += t_delta_y
+
+
+def ray_rect_distance(x, y, dir_x, dir_y, rect):
+    """Пересечение луча с прямоугольником (метод слоев); возвращает расстояние или None"""
+    t_near = -math.inf
+    t_far = math.inf
+    for origin, direction, low, high in ((x, dir_x, rect.left, rect.right),
+                                         (y, dir_y, rect.top, rect.bottom)):
+        if direction == 0:
+            # Луч параллелен слою - он либо внутри, либо промахивается
+            if origin < low or origin >= high:
+                return None
+            continue
+        t1 = (low - origin) / direction
+        t2 = (high - origin) / direction
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_near = max(t_near, t1)
+        t_far = min(t_far, t2)
+        if t_near > t_far:
+            return None
+    if t_far < 0:
+        return None
+    return max(t_near, 0.0)
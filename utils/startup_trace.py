@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTrace:
+    """Замер времени запуска по участкам section(): от старта программы до первого кадра"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.entries = []  # (глубина, имя, длительность в секундах)
+        self.depth = 0
+        self.first_frame = None
+
+    def set_start(self, start):
+        """Начало замера - момент запуска программы (time.perf_counter() до импортов)"""
+        self.start = start
+        # Все, что прошло от запуска до этого вызова, - импорт модулей
+        self.entries.insert(0, (0, "импорт модулей", time.perf_counter() - start))
+
+    @property
+    def recording(self):
+        return self.first_frame is None
+
+    @contextmanager
+    def section(self, name):
+        if not self.recording:
+            yield
+            return
+        index = len(self.entries)
+        self.entries.append((self.depth, name, 0.0))
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.entries[index] = (self.depth, name, time.perf_counter() - start)
+
+    def frame_shown(self):
+        """Отмечает первый показанный кадр"""
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.start
+
+    def report(self):
+        lines = [f"Время до первого кадра: {self.first_frame * 1000:.1f} мс"]
+        for depth, name, duration in self.entries:
+            lines.append(f"{'  ' * (depth + 1)}{name}: {duration * 1000:.1f} мс")
+        return "\n".join(lines)
+
+
+# Общий замер запуска (сцены и загрузчики ресурсов добавляют в него свои участки)
+startup_trace = StartupTrace()
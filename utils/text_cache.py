@@ -0,0 +1,85 @@
+import os
+from collections import OrderedDict
+import pygame
+from settings import *
+
+# Шрифты игры (если файла нет - используется системный Arial)
+TITLE_FONT = os.path.join('assets', 'fonts', 'Nosifer', 'Nosifer-Regular.ttf')
+TEXT_FONT = os.path.join('assets', 'fonts', 'Special_Elite', 'SpecialElite-Regular.ttf')
+
+# Символы, из заранее отрисованных глифов которых собираются числа HUD
+NUMBER_GLYPHS = "0123456789-%"
+
+
+class TextCache:
+    """Общий LRU-кеш шрифтов и отрисованных надписей (поверхности общие - только копировать на экран)"""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fonts = {}  # (путь, размер) -> pygame.font.Font
+        self.surfaces = OrderedDict()  # (путь, размер, текст, цвет, сглаживание) -> поверхность
+        self.glyphs = {}  # (путь, размер, цвет) -> {символ: поверхность}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, path, size):
+        """Шрифт из файла path (None или нет файла - системный Arial), загружается один раз"""
+        font = self.fonts.get((path, size))
+        if font is None:
+            if path is not None and os.path.exists(path):
+                font = pygame.font.Font(path, size)
+            else:
+                font = pygame.font.SysFont('Arial', size)
+            self.fonts[(path, size)] = font
+        return font
+
+    def render(self, path, size, text, color, antialias=True):
+        """Поверхность с надписью (из кеша, если такая уже отрисовывалась)"""
+        key = (path, size, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(path, size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def draw_number(self, screen, path, size, value, color, pos, suffix=""):
+        """Рисует число (и суффикс, например "%") из глифов цифр; возвращает ширину"""
+        key = (path, size, tuple(color))
+        glyphs = self.glyphs.get(key)
+        if glyphs is None:
+            font = self.font(path, size)
+            glyphs = {char: font.render(char, True, color) for char in NUMBER_GLYPHS}
+            self.glyphs[key] = glyphs
+
+        x, y = pos
+        blits = []
+        for char in f"{value}{suffix}":
+            glyph = glyphs[char]
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        screen.blits(blits, doreturn=False)
+        return x - pos[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.surfaces),
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+# Общий кеш для всех сцен
+text_cache = TextCache()